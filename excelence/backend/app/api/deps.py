@@ -1,34 +1,116 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
+from jose import ExpiredSignatureError, JWTError
+from pydantic import ValidationError
 from app import models
-from app.db.session import supabase, get_supabase_client
-from typing import Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_access_token, seconds_until_expiry
+from app.core.upstream import UpstreamUnavailable
+from app.crud.cache import data_etag
+from app.db import session
+from typing import Optional, Tuple
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login"
 )
 
-def get_current_user(token: str = Depends(reusable_oauth2)) -> models.User:
+# Recently verified tokens -> models.User, used when AUTH_LOCAL_JWT is enabled
+token_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+verification_counts = {"local": 0, "remote": 0}
+
+
+def auth_cache_stats() -> dict:
+    """Token cache hit/miss counters plus how each miss was verified."""
+    return {**token_cache.stats(), **{f"{k}_verifications": v for k, v in verification_counts.items()}}
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Could not validate credentials",
+    )
+
+
+def _verify_locally(token: str) -> Optional[models.User]:
+    """
+    Returns None when the token cannot be verified locally (e.g. it was signed
+    with a different key) and should be checked with Supabase instead.
+    """
     try:
-        user = supabase.auth.get_user(token).user
+        claims = decode_access_token(token)
+        user_obj = models.User(id=claims["sub"], email=claims.get("email"), is_active=True)
+    except ExpiredSignatureError:
+        raise _credentials_exception()
+    except (JWTError, ValidationError):
+        return None
+    verification_counts["local"] += 1
+    return user_obj
+
+
+async def _verify_remotely(token: str) -> models.User:
+    try:
+        user = (await session.get_user(token)).user
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        
+
         # Adapt the Supabase user model to your internal models.User
         user_obj = models.User(id=user.id, email=user.email, is_active=True)
+    except UpstreamUnavailable:
+        # Not the token's fault; a 403 would log the client out
+        raise
+    except Exception:
+        raise _credentials_exception()
+    verification_counts["remote"] += 1
+    return user_obj
+
+
+async def get_current_user(token: str = Depends(reusable_oauth2)) -> models.User:
+    if not settings.AUTH_LOCAL_JWT:
+        user_obj = await _verify_remotely(token)
         # Store the token on the user object so we can use it for RLS
         user_obj.access_token = token
         return user_obj
-        
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
 
-def get_current_active_user(
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    user_obj = _verify_locally(token) or await _verify_remotely(token)
+    user_obj.access_token = token
+    # Never serve a cached user past the token's own expiry
+    token_cache.set(token, user_obj, ttl=seconds_until_expiry(token))
+    return user_obj
+
+async def get_current_active_user(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: models.User = Depends(get_current_user),
+) -> None:
+    """
+    Tags a read with the user's data ETag, and answers 304 Not Modified
+    before the endpoint runs when the client already has that version.
+    """
+    etag = data_etag(current_user.id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
-from app.db.session import supabase
+from app.db import session
 from app.core.config import settings
+from app.core import upstream
+from app.core.idempotency import idempotent_requests, scoped_key
+from app.core.upstream import UpstreamUnavailable
 
 router = APIRouter()
 
@@ -12,15 +16,24 @@ class UserCreate(BaseModel):
     password: str
 
 @router.post("/signup")
-def signup(user: UserCreate):
+def signup(
+    user: UserCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, description="Replays the first result for retries that repeat the key"),
+):
     """
-    Create a new user.
+    Create a new user. A retry with the same `Idempotency-Key` header gets
+    the original signup result rather than a duplicate-user error.
     """
+    key = scoped_key(idempotency_key, user.email, "POST /auth/signup")
+    return idempotent_requests.run_sync(key, user, response, lambda: _signup(user))
+
+def _signup(user: UserCreate):
     try:
-        res = supabase.auth.sign_up({
+        res = upstream.call_sync(lambda: session.get_client().auth.sign_up({
             "email": user.email,
             "password": user.password,
-        })
+        }), "auth.sign_up")
         
         # Check if signup was successful
         # When a user already exists and email confirmations are enabled,
@@ -56,16 +69,18 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
     Authenticate a user and return a token.
     """
     try:
-        res = supabase.auth.sign_in_with_password({
+        res = upstream.call_sync(lambda: session.get_client().auth.sign_in_with_password({
             "email": form_data.username,
             "password": form_data.password,
-        })
+        }), "auth.sign_in")
         if res.session:
             return {
                 "access_token": res.session.access_token,
                 "token_type": "bearer"
             }
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
@@ -78,11 +93,13 @@ def resend_verification(data: ResendVerification):
     Resend verification email to the user.
     """
     try:
-        res = supabase.auth.resend({
+        res = upstream.call_sync(lambda: session.get_client().auth.resend({
             "type": "signup",
             "email": data.email,
-        })
+        }), "auth.resend")
         return {"message": "Verification email sent successfully"}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
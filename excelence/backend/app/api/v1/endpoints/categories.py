@@ -1,94 +1,98 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from app.db.session import supabase
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from app.api import deps
-from app import models
+from app import crud, models
+from app.core.responses import resolve_fields, select_columns, trusted_rows_response
+from app.core.upstream import UpstreamUnavailable
+from app.schemas import Category, CategoryCreate, CategoryUpdate, CategoryWithUsage
 import uuid
 
 router = APIRouter()
 
-# --- Pydantic Models ---
-class CategoryCreate(BaseModel):
-    name: str
-    emoji: str | None = None
-
-class CategoryUpdate(BaseModel):
-    name: str
-    emoji: str | None = None
-
-class Category(BaseModel):
-    id: uuid.UUID
-    name: str
-    emoji: str | None = None
-    user_id: uuid.UUID
+USAGE_FIELDS = ["transaction_count", "last_used", "month_income", "month_expense"]
+# Usage of categories no transaction refers to
+UNUSED = {"transaction_count": 0, "last_used": None, "month_income": 0, "month_expense": 0}
 
 # --- API Endpoints ---
 @router.post("/", response_model=Category)
-def create_category(category: CategoryCreate, user: models.User = Depends(deps.get_current_user)):
+async def create_category(category: CategoryCreate, user: models.User = Depends(deps.get_current_user)):
     """
     Create a new category for the current user.
     """
     try:
         user_id = user.id
-        response = supabase.table('categories').insert({
-            "name": category.name,
-            "emoji": category.emoji,
-            "user_id": str(user_id)
-        }).execute()
+        created_category = await crud.categories.create_category(user_id, category.name, category.emoji)
 
-        if not response.data:
+        if not created_category:
             raise HTTPException(status_code=500, detail="Failed to create category.")
 
-        created_category = response.data[0]
-        return Category(
-            id=created_category['id'],
-            name=created_category['name'],
-            emoji=created_category.get('emoji'),
-            user_id=created_category['user_id']
-        )
+        return created_category
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/", response_model=List[Category])
-def read_categories(user: models.User = Depends(deps.get_current_user)):
+@router.get("/", response_model=List[CategoryWithUsage], dependencies=[Depends(deps.conditional_get)])
+async def read_categories(
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    with_usage: bool = Query(False, description="Add transaction_count, last_used, month_income and month_expense"),
+    user: models.User = Depends(deps.get_current_user),
+):
     """
     Retrieve all categories for the current user.
+    With `fields`, only those fields are selected and returned. With
+    `with_usage`, each category also gets its number of transactions, the
+    date it was last used and its income and expense totals for the
+    current (UTC) month.
     """
     try:
         user_id = user.id
-        response = supabase.table('categories').select("*").eq('user_id', str(user_id)).order('name').execute()
-        return [Category(**cat) for cat in response.data]
+        selected = resolve_fields(Category, fields)
+        if not with_usage:
+            rows = await crud.list_categories(user_id, columns=select_columns(Category, selected))
+            return trusted_rows_response(rows, Category, headers=response.headers, fields=selected)
+
+        # Usage is joined on id, so it is selected even when not returned
+        columns = select_columns(Category, selected if "id" in selected else ["id", *selected])
+        rows, usage = await asyncio.gather(
+            crud.list_categories(user_id, columns=columns),
+            crud.categories.get_category_usage(user_id),
+        )
+        rows = [{**row, **usage.get(str(row["id"]), UNUSED)} for row in rows]
+        return trusted_rows_response(
+            rows, CategoryWithUsage, headers=response.headers, fields=selected + USAGE_FIELDS
+        )
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{category_id}", response_model=Category)
-def update_category(category_id: uuid.UUID, category: CategoryUpdate, user: models.User = Depends(deps.get_current_user)):
+async def update_category(category_id: uuid.UUID, category: CategoryUpdate, user: models.User = Depends(deps.get_current_user)):
     """
     Update a category for the current user.
     """
     try:
         user_id = user.id
         # RLS in Supabase should enforce ownership, but we double-check here.
-        response = supabase.table('categories').update({
+        updated_category = await crud.categories.update_category(category_id, user_id, {
             "name": category.name,
             "emoji": category.emoji
-        }).eq('id', str(category_id)).eq('user_id', str(user_id)).execute()
+        })
 
-        if not response.data:
+        if not updated_category:
             raise HTTPException(status_code=404, detail="Category not found or user does not have permission.")
 
-        updated_category = response.data[0]
-        return Category(**updated_category)
+        return updated_category
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{category_id}", response_model=dict)
-def delete_category(category_id: uuid.UUID, user: models.User = Depends(deps.get_current_user)):
+async def delete_category(category_id: uuid.UUID, user: models.User = Depends(deps.get_current_user)):
     """
     Delete a category for the current user.
     Blocks deletion if the category is in use by any transactions.
@@ -97,19 +101,20 @@ def delete_category(category_id: uuid.UUID, user: models.User = Depends(deps.get
         user_id = user.id
 
         # Deletion Blocking Logic (Subtask 1.5)
-        # Check if any transactions are using this category
-        transaction_check = supabase.table('transactions').select('id', count='exact').eq('category_id', str(category_id)).eq('user_id', str(user_id)).execute()
+        # Check if any transactions are using this category. The usage
+        # aggregate is shared with the category list (and usually cached);
+        # the foreign key still rejects deletes it missed.
+        usage = await crud.categories.get_category_usage(user_id)
+        in_use = usage.get(str(category_id), UNUSED)["transaction_count"]
         
-        if transaction_check.count > 0:
+        if in_use > 0:
             raise HTTPException(
                 status_code=400,
-                detail=f"Cannot delete category: It is currently in use by {transaction_check.count} transaction(s)."
+                detail=f"Cannot delete category: It is currently in use by {in_use} transaction(s)."
             )
 
         # Proceed with deletion
-        response = supabase.table('categories').delete().eq('id', str(category_id)).eq('user_id', str(user_id)).execute()
-
-        if not response.data:
+        if not await crud.categories.delete_category(category_id, user_id):
             raise HTTPException(status_code=404, detail="Category not found or user does not have permission.")
 
         return {"detail": "Category deleted successfully"}
@@ -1,31 +1,52 @@
-from typing import Any
+from datetime import date
+from typing import Any, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app import crud, models
 from app.api import deps
-from app.schemas import Summary, ChartDataResponse
+from app.schemas import Summary, ChartDataResponse, TimeseriesResponse
 
 router = APIRouter()
 
 
-@router.get("/summary", response_model=Summary)
-def read_summary(
+@router.get("/summary", response_model=Summary, dependencies=[Depends(deps.conditional_get)])
+async def read_summary(
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve financial summary.
     """
-    summary = crud.transactions.get_summary(user_id=current_user.id)
+    summary = await crud.transactions.get_summary(user_id=current_user.id)
     return summary
 
 
-@router.get("/chart-data", response_model=ChartDataResponse)
-def get_chart_data(
+@router.get("/chart-data", response_model=ChartDataResponse, dependencies=[Depends(deps.conditional_get)])
+async def get_chart_data(
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve chart data (expenses by category).
     """
-    data = crud.transactions.get_expenses_by_category(user_id=current_user.id)
+    data = await crud.transactions.get_expenses_by_category(user_id=current_user.id)
     return {"status": "success", "data": data}
+
+
+@router.get("/timeseries", response_model=TimeseriesResponse, dependencies=[Depends(deps.conditional_get)])
+async def get_timeseries(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    granularity: Literal["day", "week", "month"] = "month",
+    group_by: Literal["category", "type"] = "type",
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve totals per day, week or month, grouped by transaction type or
+    by expense category, as one period axis and one value list per series.
+    """
+    try:
+        return await crud.transactions.get_timeseries(
+            current_user.id, date_from, date_to, granularity, group_by
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
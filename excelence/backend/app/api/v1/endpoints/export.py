@@ -1,63 +1,215 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator, BinaryIO, Iterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from app.db.session import supabase
 from app.api import deps
-from app import models
+from app import crud, models
+from app.core.config import settings
+from app.core.upstream import UpstreamUnavailable
+from datetime import date
 import csv
 import io
+import tempfile
+import zlib
 
 router = APIRouter()
 
+CSV_HEADER = ['Date', 'Description', 'Category', 'Amount', 'Type']
+# fields= name -> (upstream select, CSV value), in CSV_HEADER order
+CSV_FIELDS = {
+    'date': ('date', lambda t: t.get('date', '')),
+    'description': ('description', lambda t: t.get('description', '')),
+    'category': ('categories(name)', lambda t: category_name(t)),
+    'amount': ('amount', lambda t: t.get('amount', 0.0)),
+    'type': ('type', lambda t: t.get('type', '')),
+}
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def category_name(t: dict) -> str:
+    """
+    Handle joined category data.
+    Supabase returns joined data as a nested dictionary or list of dictionaries.
+    """
+    category_name = "Uncategorized"
+    categories_data = t.get('categories')
+
+    if categories_data:
+        # If it's a dict (single relation)
+        if isinstance(categories_data, dict):
+            category_name = categories_data.get('name', 'Uncategorized')
+        # If it's a list (shouldn't be for Many-to-One, but safe to check)
+        elif isinstance(categories_data, list) and len(categories_data) > 0:
+            category_name = categories_data[0].get('name', 'Uncategorized')
+    return category_name
+
+def resolve_csv_fields(fields: Optional[str]) -> list[str]:
+    """CSV columns requested as `fields=a,b`, in export order; all by default."""
+    if not fields:
+        return list(CSV_FIELDS)
+    requested = {f.strip().lower() for f in fields.split(",") if f.strip()}
+    unknown = requested - CSV_FIELDS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(CSV_FIELDS)}"
+        )
+    return [f for f in CSV_FIELDS if f in requested]
+
+async def csv_chunks(
+    first_page: list[dict],
+    pages: AsyncIterator[list[dict]],
+    fields: Optional[list[str]] = None,
+) -> AsyncIterator[str]:
+    """Yields the CSV header and then one chunk of rows per fetched page."""
+    fields = fields or list(CSV_FIELDS)
+    values = [CSV_FIELDS[f][1] for f in fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    header = dict(zip(CSV_FIELDS, CSV_HEADER))
+    writer.writerow([header[f] for f in fields])
+    page = first_page
+    while page is not None:
+        for t in page:
+            writer.writerow([value(t) for value in values])
+        yield flush()
+        page = await anext(pages, None)
+
+async def gzip_chunks(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
 @router.get("/csv")
-def export_transactions_csv(user: models.User = Depends(deps.get_current_user)):
+async def export_transactions_csv(
+    gzip: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export, e.g. date,amount,category"),
+    user: models.User = Depends(deps.get_current_user),
+):
     """
     Export all transactions for the current user as a CSV file.
+    Rows are fetched page by page and streamed as they are written, so memory
+    use does not grow with the size of the history. Pass `gzip=true` for a
+    gzip-encoded response, and `fields` to export only some columns.
     """
     try:
         user_id = user.id
-        
+        selected = resolve_csv_fields(fields)
+
         # Fetch transactions with category names
         # Using Supabase foreign table join syntax: categories(name)
         # This assumes a foreign key relationship exists between transactions.category_id and categories.id
-        response = supabase.table('transactions').select('*, categories(name)').eq('user_id', str(user_id)).order('date', desc=True).execute()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write Header
-        writer.writerow(['Date', 'Description', 'Category', 'Amount', 'Type'])
-
-        if response.data:
-            transactions = response.data
-            for t in transactions:
-                # Handle joined category data
-                # Supabase returns joined data as a nested dictionary or list of dictionaries
-                category_name = "Uncategorized"
-                categories_data = t.get('categories')
-                
-                if categories_data:
-                    # If it's a dict (single relation)
-                    if isinstance(categories_data, dict):
-                        category_name = categories_data.get('name', 'Uncategorized')
-                    # If it's a list (shouldn't be for Many-to-One, but safe to check)
-                    elif isinstance(categories_data, list) and len(categories_data) > 0:
-                        category_name = categories_data[0].get('name', 'Uncategorized')
-                
-                writer.writerow([
-                    t.get('date', ''),
-                    t.get('description', ''),
-                    category_name,
-                    t.get('amount', 0.0),
-                    t.get('type', '')
-                ])
-
-        output.seek(0)
-        
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=export.csv"}
+        pages = crud.transactions.iter_transaction_pages(
+            user_id,
+            page_size=settings.EXPORT_PAGE_SIZE,
+            columns=', '.join(CSV_FIELDS[f][0] for f in selected),
         )
+        # Fetch the first page up front so upstream errors still become a 400
+        first_page = await anext(pages, [])
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    body = csv_chunks(first_page, pages, selected)
+    headers = {"Content-Disposition": "attachment; filename=export.csv"}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        body,
+        media_type="text/csv",
+        headers=headers
+    )
+
+class XlsxExportWriter:
+    """
+    Builds the XLSX export with openpyxl's write-only workbook: rows are
+    serialized to per-sheet temp files as they are appended, so the full
+    workbook is never held in memory. Expects rows newest first.
+    """
+
+    def __init__(self):
+        # openpyxl takes ~0.1 s to import; only XLSX requests pay for it
+        from openpyxl import Workbook
+        self.workbook = Workbook(write_only=True)
+        self.summary = self.workbook.create_sheet("Summary")
+        self.sheet = None
+        self.year = None
+        # year -> [income, expenses, transaction count]
+        self.totals: dict[int, list] = {}
+
+    def write_rows(self, rows: list[dict]) -> None:
+        for t in rows:
+            row_date = date.fromisoformat(str(t['date']))
+            if row_date.year != self.year:
+                self.year = row_date.year
+                self.sheet = self.workbook.create_sheet(str(self.year))
+                self.sheet.append(CSV_HEADER)
+            amount = float(t.get('amount') or 0)
+            self.sheet.append([
+                row_date,
+                t.get('description') or '',
+                category_name(t),
+                amount,
+                t.get('type', '')
+            ])
+            totals = self.totals.setdefault(self.year, [0.0, 0.0, 0])
+            if t.get('type') == 'income':
+                totals[0] += amount
+            elif t.get('type') == 'expense':
+                totals[1] += amount
+            totals[2] += 1
+
+    def save(self, output: BinaryIO) -> None:
+        self.summary.append(['Year', 'Income', 'Expenses', 'Net', 'Transactions'])
+        for year, (income, expenses, count) in self.totals.items():
+            self.summary.append([year, income, expenses, income - expenses, count])
+        income = sum(t[0] for t in self.totals.values())
+        expenses = sum(t[1] for t in self.totals.values())
+        count = sum(t[2] for t in self.totals.values())
+        self.summary.append(['Total', income, expenses, income - expenses, count])
+        self.workbook.save(output)
+
+def iter_file(f: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    try:
+        while chunk := f.read(chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+@router.get("/xlsx")
+async def export_transactions_xlsx(user: models.User = Depends(deps.get_current_user)):
+    """
+    Export all transactions for the current user as an Excel workbook,
+    with one sheet per year and a summary sheet of yearly totals.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    try:
+        writer = XlsxExportWriter()
+        async for page in crud.transactions.iter_transaction_pages(
+            user.id, page_size=settings.EXPORT_PAGE_SIZE, columns='*, categories(name)'
+        ):
+            await run_in_threadpool(writer.write_rows, page)
+        await run_in_threadpool(writer.save, output)
+        output.seek(0)
     except Exception as e:
+        output.close()
+        if isinstance(e, UpstreamUnavailable):
+            raise
         raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        iter_file(output),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": "attachment; filename=export.xlsx"}
+    )
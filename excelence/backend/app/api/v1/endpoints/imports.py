@@ -0,0 +1,195 @@
+from typing import BinaryIO, Iterator, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.api import deps
+from app import crud, models
+from app.core.config import settings
+from app.core.upstream import UpstreamUnavailable
+from app.schemas import ImportResult, ImportRowError
+from datetime import date, datetime
+import csv
+import io
+import math
+
+router = APIRouter()
+
+# Same columns as the CSV/XLSX export, so exported files can be re-imported.
+# Only Date and Amount are required; without a Type column the sign of the
+# amount decides between income and expense.
+REQUIRED_COLUMNS = {'date', 'amount'}
+DEFAULT_CATEGORY = "Uncategorized"
+
+# (sheet, row number, raw values keyed by lower-cased column name)
+RawRow = tuple[Optional[str], int, dict]
+
+def _columns(header) -> list[str]:
+    return [str(h).strip().lower() if h is not None else '' for h in header]
+
+def iter_csv_rows(f: BinaryIO) -> Iterator[RawRow]:
+    reader = csv.reader(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''))
+    columns = _columns(next(reader, []))
+    if not REQUIRED_COLUMNS.issubset(columns):
+        raise ValueError("CSV header must contain at least Date and Amount columns.")
+    for row_number, values in enumerate(reader, start=2):
+        if any(values):
+            yield None, row_number, dict(zip(columns, values))
+
+def iter_xlsx_rows(f: BinaryIO) -> Iterator[RawRow]:
+    """Reads every sheet whose header has Date and Amount (skips e.g. Summary)."""
+    # Imported here so only XLSX imports pay for loading openpyxl
+    from openpyxl import load_workbook
+    workbook = load_workbook(f, read_only=True, data_only=True)
+    try:
+        found = False
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            columns = _columns(next(rows, ()))
+            if not REQUIRED_COLUMNS.issubset(columns):
+                continue
+            found = True
+            for row_number, values in enumerate(rows, start=2):
+                if any(v is not None for v in values):
+                    yield sheet.title, row_number, dict(zip(columns, values))
+        if not found:
+            raise ValueError("No sheet has a header with at least Date and Amount columns.")
+    finally:
+        workbook.close()
+
+def parse_row(raw: dict) -> tuple[dict, str]:
+    """
+    Validates one raw row. Returns the transaction fields and category name,
+    or raises ValueError/TypeError with a message for the per-row report.
+    """
+    raw_date = raw.get('date')
+    if isinstance(raw_date, datetime):
+        row_date = raw_date.date()
+    elif isinstance(raw_date, date):
+        row_date = raw_date
+    else:
+        row_date = date.fromisoformat(str(raw_date).strip())
+
+    raw_amount = raw.get('amount')
+    if raw_amount is None or raw_amount == '':
+        raise ValueError("Amount is required")
+    amount = float(raw_amount)
+    # float() also parses "nan", "inf" and overflowing values like "1e309"
+    if not math.isfinite(amount):
+        raise ValueError(f"Invalid amount '{raw_amount}'")
+
+    kind = str(raw.get('type') or '').strip().lower()
+    if not kind:
+        kind = 'expense' if amount < 0 else 'income'
+    elif kind not in ('income', 'expense'):
+        raise ValueError(f"Invalid type '{kind}', expected 'income' or 'expense'")
+
+    description = raw.get('description')
+    category = str(raw.get('category') or '').strip() or DEFAULT_CATEGORY
+    return {
+        "date": row_date.isoformat(),
+        "amount": abs(amount),
+        "type": kind,
+        "description": str(description) if description not in (None, '') else None,
+    }, category
+
+def parse_batch(rows: Iterator[RawRow], size: int, last: tuple[Optional[str], int]):
+    """
+    Pulls up to `size` rows from the stream and validates them. `last` is
+    the (sheet, row number) of the row read before this batch. Returns
+    (valid rows, row errors, position of the last row read, or None if
+    the stream had ended). A CSV that cannot be decoded or parsed past some
+    row is reported as an error on that row and ends the stream.
+    """
+    valid, errors, consumed = [], [], 0
+    sheet, row_number = last
+    try:
+        for sheet, row_number, raw in rows:
+            consumed += 1
+            try:
+                fields, category = parse_row(raw)
+                valid.append((sheet, row_number, fields, category))
+            except (ValueError, TypeError) as e:
+                errors.append(ImportRowError(row=row_number, sheet=sheet, error=str(e)))
+            if consumed >= size:
+                break
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The generator is finished, so the next batch finds the stream ended
+        row_number += 1
+        consumed += 1
+        errors.append(ImportRowError(row=row_number, sheet=sheet, error=f"The file could not be read from this row on: {e}"))
+    return valid, errors, (sheet, row_number) if consumed else None
+
+@router.post("/", response_model=ImportResult)
+async def import_transactions(
+    file: UploadFile = File(...),
+    user: models.User = Depends(deps.get_current_user),
+):
+    """
+    Import transactions from an uploaded CSV or XLSX file.
+    The file is parsed as a stream and inserted in batches of
+    IMPORT_BATCH_SIZE rows. Categories are matched by name (case-insensitive)
+    and missing ones are created. Rows that fail validation or insertion are
+    reported individually. Once a batch has been inserted, a failure that
+    stops the import is reported as an error on the row it stopped at, and
+    the rows imported so far are returned rather than an error response.
+    """
+    is_xlsx = (file.filename or '').lower().endswith('.xlsx') or file.content_type == (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    user_id = str(user.id)
+    result = ImportResult(imported=0, failed=0)
+    # (sheet, row number) of the last row read; nothing has been read yet
+    last = (None, 0)
+
+    try:
+        rows = iter_xlsx_rows(file.file) if is_xlsx else iter_csv_rows(file.file)
+        # One lookup for all of the user's categories
+        categories = {
+            c['name'].lower(): c['id']
+            for c in await crud.list_categories(user.id, columns='id, name')
+        }
+
+        while True:
+            valid, errors, position = await run_in_threadpool(
+                parse_batch, rows, settings.IMPORT_BATCH_SIZE, last
+            )
+            if position is None:
+                break
+            last = position
+            result.errors.extend(errors)
+            if not valid:
+                continue
+
+            try:
+                missing = {}
+                for *_, category in valid:
+                    if category.lower() not in categories:
+                        missing.setdefault(category.lower(), category)
+                for created in await crud.create_categories(user.id, list(missing.values())):
+                    categories[created['name'].lower()] = created['id']
+                    result.created_categories.append(created['name'])
+
+                batch = [
+                    {**fields, "category_id": categories[category.lower()], "user_id": user_id}
+                    for *_, fields, category in valid
+                ]
+                await crud.transactions.create_transactions(batch)
+                result.imported += len(batch)
+            except Exception as e:
+                # Nothing is committed yet, so the whole file can be retried
+                if isinstance(e, UpstreamUnavailable) and not result.imported:
+                    raise
+                result.errors.extend(
+                    ImportRowError(row=row_number, sheet=sheet, error=str(e))
+                    for sheet, row_number, *_ in valid
+                )
+    except Exception as e:
+        if result.imported:
+            sheet, row_number = last
+            result.errors.append(ImportRowError(row=row_number + 1, sheet=sheet, error=f"Import stopped: {e}"))
+        elif isinstance(e, UpstreamUnavailable):
+            raise
+        else:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    result.failed = len(result.errors)
+    return result
@@ -1,114 +1,244 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
-from app.db.session import supabase
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 from app.api import deps
 from app import crud, models
+from app.core.config import settings
+from app.core.idempotency import idempotent_requests, scoped_key
+from app.core.responses import resolve_fields, select_columns, trusted_rows_response
+from app.core.upstream import UpstreamUnavailable
+from app.schemas import (
+    BatchItemResult,
+    Transaction,
+    TransactionBatch,
+    TransactionBatchResult,
+    TransactionCreate,
+    TransactionFilter,
+    TransactionUpdate,
+)
 import uuid
-from datetime import date
 
 router = APIRouter()
 
-# --- Pydantic Models ---
-class TransactionCreate(BaseModel):
-    amount: float
-    type: str  # "income" or "expense"
-    date: date
-    description: Optional[str] = None
-    category_id: uuid.UUID
-
-class Transaction(BaseModel):
-    id: uuid.UUID
-    amount: float
-    type: str
-    date: date
-    description: Optional[str] = None
-    user_id: uuid.UUID
-    category_id: uuid.UUID
-
-class TransactionUpdate(BaseModel):
-    amount: Optional[float] = None
-    type: Optional[str] = None  # "income" or "expense"
-    date: Optional[str] = None  # Accept string in ISO format
-    description: Optional[str] = None
-    category_id: Optional[str] = None  # Accept string UUID
+def _item_status(e: Exception) -> int:
+    """Batch item status for a failed upstream call: 503 if it may succeed on retry."""
+    return e.status_code if isinstance(e, UpstreamUnavailable) else 400
 
 # --- API Endpoints ---
-@router.get("/", response_model=List[Transaction])
-def list_transactions(user: models.User = Depends(deps.get_current_user)):
+@router.get("/", response_model=List[Transaction], dependencies=[Depends(deps.conditional_get)])
+async def list_transactions(
+    response: Response,
+    filters: TransactionFilter = Depends(),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. date,amount,category_id"),
+    user: models.User = Depends(deps.get_current_user),
+):
     """
-    Retrieve all transactions for the current user.
+    Retrieve transactions for the current user, newest first.
+    With `limit`, results are paginated: pass the `X-Next-Cursor` response
+    header back as `cursor` to fetch the next page. With `fields`, only
+    those fields are selected and returned.
     """
     try:
         user_id = user.id
-        response = supabase.table('transactions').select('*').match({
-            'user_id': str(user_id)
-        }).order('date', desc=True).execute()
+        selected = resolve_fields(Transaction, fields)
+        rows, next_cursor = await crud.transactions.list_transactions(
+            user_id, filters=filters, limit=limit, cursor=cursor, columns=select_columns(Transaction, selected)
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        return trusted_rows_response(rows, Transaction, headers=response.headers, fields=selected)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        if not response.data:
-            return []
+@router.get("/search", response_model=List[Transaction], dependencies=[Depends(deps.conditional_get)])
+async def search_transactions(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in descriptions and category names"),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    user: models.User = Depends(deps.get_current_user),
+):
+    """
+    Search the current user's transactions by description and category
+    name. Every word of `q` must match, as a whole word, a word prefix, or
+    with a typo or two in longer words; results are ranked best match
+    first, then newest first. Paginated like the list: pass the
+    `X-Next-Cursor` response header back as `cursor`.
+    """
+    try:
+        rows, next_cursor = await crud.transactions.search_transactions(user.id, q, limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
-        return [Transaction(**t) for t in response.data]
+        return trusted_rows_response(rows, Transaction, headers=response.headers)
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{transaction_id}", response_model=Transaction)
-def update_transaction(transaction_id: uuid.UUID, transaction: TransactionUpdate, user: models.User = Depends(deps.get_current_user)):
+async def update_transaction(transaction_id: uuid.UUID, transaction: TransactionUpdate, user: models.User = Depends(deps.get_current_user)):
     """
     Update a transaction for the current user.
     """
     try:
         user_id = user.id
-        update_data = transaction.dict(exclude_unset=True)
+        update_data = transaction.model_dump(mode='json', exclude_unset=True)
 
         if not update_data:
             raise HTTPException(status_code=400, detail="No update data provided.")
 
-        response = supabase.table('transactions').update(update_data).match({
-            'id': str(transaction_id),
-            'user_id': str(user_id)
-        }).execute()
+        updated_transaction = await crud.transactions.update_transaction(transaction_id, user_id, update_data)
 
-        if not response.data:
+        if not updated_transaction:
             raise HTTPException(status_code=404, detail="Transaction not found or user does not have permission.")
 
-        updated_transaction = response.data[0]
-        return Transaction(**updated_transaction)
+        return updated_transaction
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/", response_model=Transaction)
-def create_transaction(transaction: TransactionCreate, user: models.User = Depends(deps.get_current_user)):
+async def create_transaction(
+    transaction: TransactionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, description="Replays the first result for retries that repeat the key"),
+    user: models.User = Depends(deps.get_current_user),
+):
     """
-    Create a new transaction for the current user.
+    Create a new transaction for the current user. Requests retried with
+    the same `Idempotency-Key` header get the original transaction back
+    instead of creating another one.
     """
+    key = scoped_key(idempotency_key, user.id, "POST /transactions/")
+    return await idempotent_requests.run(key, transaction, response, lambda: _create_transaction(transaction, user))
+
+async def _create_transaction(transaction: TransactionCreate, user: models.User):
     try:
         user_id = user.id
-        response = supabase.table('transactions').insert({
+        created_transaction = await crud.transactions.create_transaction({
             "amount": transaction.amount,
             "type": transaction.type,
             "date": str(transaction.date),
             "description": transaction.description,
             "category_id": str(transaction.category_id),
             "user_id": str(user_id)
-        }).execute()
+        })
 
-        if not response.data:
+        if not created_transaction:
             raise HTTPException(status_code=500, detail="Failed to create transaction.")
 
-        created_transaction = response.data[0]
-        return Transaction(**created_transaction)
+        return created_transaction
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/batch", response_model=TransactionBatchResult)
+async def batch_transactions(
+    batch: TransactionBatch,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, description="Replays the first result for retries that repeat the key"),
+    user: models.User = Depends(deps.get_current_user),
+):
+    """
+    Create, update and delete many transactions for the current user at once.
+    All creates go in one insert, updates are grouped by identical changes
+    (so e.g. a bulk recategorize is one call), and deletes are one call.
+    Returns one result per item. Like POST /, accepts an `Idempotency-Key`.
+    """
+    total = len(batch.create) + len(batch.update) + len(batch.delete)
+    if total > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items.")
+
+    key = scoped_key(idempotency_key, user.id, "POST /transactions/batch")
+    return await idempotent_requests.run(
+        key, batch, response, lambda: _apply_batch(batch, user),
+        # Items that failed on an outage must be retried, not replayed
+        store_if=lambda result: all(item.status < 500 for item in result.results),
+    )
+
+async def _apply_batch(batch: TransactionBatch, user: models.User) -> TransactionBatchResult:
+    user_id = user.id
+    not_found = "Transaction not found or user does not have permission."
+    results: List[BatchItemResult] = []
+
+    if batch.create:
+        rows = [{
+            "amount": t.amount,
+            "type": t.type,
+            "date": str(t.date),
+            "description": t.description,
+            "category_id": str(t.category_id),
+            "user_id": str(user_id)
+        } for t in batch.create]
+        try:
+            created = await crud.transactions.create_transactions(rows)
+            results.extend(
+                BatchItemResult(op="create", index=i, id=row['id'], status=200)
+                for i, row in enumerate(created)
+            )
+        except Exception as e:
+            results.extend(
+                BatchItemResult(op="create", index=i, status=_item_status(e), error=str(e))
+                for i in range(len(batch.create))
+            )
+
+    # Group updates that apply the same changes into one upstream call each
+    groups: dict[tuple, list[tuple[int, uuid.UUID]]] = {}
+    for i, item in enumerate(batch.update):
+        changes = item.model_dump(mode='json', exclude_unset=True, exclude={'id'})
+        if not changes:
+            results.append(BatchItemResult(op="update", index=i, id=item.id, status=400, error="No update data provided."))
+            continue
+        groups.setdefault(tuple(sorted(changes.items())), []).append((i, item.id))
+    for changes, items in groups.items():
+        try:
+            updated = {row['id'] for row in await crud.transactions.update_transactions(
+                [transaction_id for _, transaction_id in items], user_id, dict(changes)
+            )}
+            results.extend(
+                BatchItemResult(op="update", index=i, id=transaction_id, status=200)
+                if str(transaction_id) in updated else
+                BatchItemResult(op="update", index=i, id=transaction_id, status=404, error=not_found)
+                for i, transaction_id in items
+            )
+        except Exception as e:
+            results.extend(
+                BatchItemResult(op="update", index=i, id=transaction_id, status=_item_status(e), error=str(e))
+                for i, transaction_id in items
+            )
+
+    if batch.delete:
+        try:
+            deleted = {row['id'] for row in await crud.transactions.delete_transactions(batch.delete, user_id)}
+            results.extend(
+                BatchItemResult(op="delete", index=i, id=transaction_id, status=200)
+                if str(transaction_id) in deleted else
+                BatchItemResult(op="delete", index=i, id=transaction_id, status=404, error=not_found)
+                for i, transaction_id in enumerate(batch.delete)
+            )
+        except Exception as e:
+            results.extend(
+                BatchItemResult(op="delete", index=i, id=transaction_id, status=_item_status(e), error=str(e))
+                for i, transaction_id in enumerate(batch.delete)
+            )
+
+    return TransactionBatchResult(results=results)
+
 @router.delete("/{transaction_id}", response_model=dict)
-def delete_transaction(transaction_id: uuid.UUID, user: models.User = Depends(deps.get_current_user)):
+async def delete_transaction(transaction_id: uuid.UUID, user: models.User = Depends(deps.get_current_user)):
     """
     Delete a transaction for the current user.
     """
     try:
         user_id = user.id
-        success = crud.delete_transaction(transaction_id, user_id)
+        success = await crud.delete_transaction(transaction_id, user_id)
 
         if not success:
             raise HTTPException(status_code=404, detail="Transaction not found or user does not have permission.")
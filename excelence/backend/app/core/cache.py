@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+    Sync endpoints run in Starlette's threadpool, so every operation takes
+    a lock. Entries past their expiry are dropped lazily on access.
+
+    With `weigh`, max_size bounds the total weight of the entries (e.g. rows
+    held) rather than their number; an entry heavier than max_size on its
+    own is not kept.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._on_evict = on_evict
+        self._weigh = weigh or (lambda value: 1)
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._weights: dict[Hashable, int] = {}
+        self.weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self._discard(key)
+            self.misses += 1
+        self._evicted(key, value)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        weight = self._weigh(value)
+        evicted = []
+        with self._lock:
+            if key in self._data:
+                old = self._discard(key)[1]
+                if old is not value:
+                    evicted.append((key, old))
+            if weight > self.max_size:
+                # Storing it would only flush everything else
+                evicted.append((key, value))
+                self.evictions += 1
+            else:
+                self._data[key] = (time.monotonic() + ttl, value)
+                self._weights[key] = weight
+                self.weight += weight
+                evicted.extend(self._shrink())
+        for old_key, old_value in evicted:
+            self._evicted(old_key, old_value)
+
+    def reweigh(self, key: Hashable) -> None:
+        """Re-measures an entry whose value changed in place, evicting others if it grew."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return
+            weight = self._weigh(entry[1])
+            if weight > self.max_size:
+                self._discard(key)
+                self.evictions += 1
+                evicted = [(key, entry[1])]
+            else:
+                self.weight += weight - self._weights[key]
+                self._weights[key] = weight
+                evicted = self._shrink()
+        for old_key, old_value in evicted:
+            self._evicted(old_key, old_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._discard(key) if key in self._data else None
+        if entry is None:
+            return default
+        self._evicted(key, entry[1])
+        return entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = list(self._data.items())
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+        for key, (_, value) in entries:
+            self._evicted(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "weight": self.weight,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _discard(self, key: Hashable) -> tuple[float, Any]:
+        """Removes an entry; call with the lock held."""
+        self.weight -= self._weights.pop(key)
+        return self._data.pop(key)
+
+    def _shrink(self) -> list:
+        """Evicts least recently used entries past max_size; call with the lock held."""
+        evicted = []
+        while self._data and self.weight > self.max_size:
+            old_key = next(iter(self._data))
+            evicted.append((old_key, self._discard(old_key)[1]))
+            self.evictions += 1
+        return evicted
+
+    def _evicted(self, key: Hashable, value: Any) -> None:
+        if self._on_evict is not None:
+            self._on_evict(key, value)
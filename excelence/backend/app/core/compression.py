@@ -0,0 +1,156 @@
+import zlib
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types that are already compressed or must not be buffered (event
+# streams); XLSX files are zip archives. Entries ending in "/" match the
+# whole type.
+EXCLUDED_CONTENT_TYPES = (
+    "application/grpc",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "audio/",
+    "font/woff",
+    "image/",
+    "text/event-stream",
+    "video/",
+)
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def _excluded(headers: Headers) -> bool:
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    return media_type.startswith(EXCLUDED_CONTENT_TYPES)
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits 31: a zlib stream with a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.compress(body)
+        return data + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+class CompressionResponder:
+    """
+    Compresses one response with `content_encoding`. Responses that are
+    already encoded, partial, of an excluded media type, or a single body
+    below minimum_size are passed through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, content_encoding: str, compressor: Callable[[], object]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_encoding = content_encoding
+        self.compressor = compressor
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.passthrough = False
+        self.started = False
+        self._compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers or message["status"] == 206 or _excluded(headers)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held back until the first body shows whether to compress
+                self.initial_message = message
+            return
+        if self.passthrough or message_type != "http.response.body":
+            if not self.passthrough and not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            self._compressor = self.compressor()
+            headers["Content-Encoding"] = self.content_encoding
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self._compressor.compress(body, True)
+            else:
+                message["body"] = self._compressor.compress(body, False)
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+        elif self._compressor is None:
+            # Sent uncompressed as a small single body; nothing should follow
+            await self.send(message)
+        else:
+            message["body"] = self._compressor.compress(body, more_body)
+            await self.send(message)
+
+class CompressionMiddleware:
+    """
+    Gzip, or Brotli for clients that accept it when the optional brotli
+    package is installed. Responses below minimum_size, already encoded
+    responses (e.g. the gzip CSV export) and compressed media types are
+    sent as they are. Self-contained rather than built on Starlette's
+    GZipMiddleware, whose internals differ across the versions we support.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and _accepts(accept_encoding, "br"):
+            responder = CompressionResponder(
+                self.app, self.minimum_size, "br", lambda: _Brotli(self.brotli_quality)
+            )
+        elif _accepts(accept_encoding, "gzip"):
+            responder = CompressionResponder(
+                self.app, self.minimum_size, "gzip", lambda: _Gzip(self.gzip_level)
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
@@ -0,0 +1,129 @@
+import math
+from typing import Dict, Iterable, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core import metrics, timing
+
+class AdaptiveLimit:
+    """
+    Concurrency limit that follows latency, after the gradient algorithm of
+    Netflix's concurrency-limits. A long-window average of upstream latency
+    is the baseline; while the short-window average rises above it the limit
+    shrinks in proportion, and while it stays close the limit grows by about
+    sqrt(limit) per sample. The limit never leaves [min_limit, max_limit].
+    """
+
+    # Latency may grow this much over the baseline before the limit shrinks
+    TOLERANCE = 1.5
+    # Latencies below this count as healthy whatever the baseline, so calls
+    # going from 1 ms to 20 ms under load don't read as an upstream slowdown
+    HEALTHY_LATENCY = 0.05
+    # Fraction of each new estimate applied to the limit
+    SMOOTHING = 0.2
+    SHORT_WINDOW = 10
+    LONG_WINDOW = 500
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+
+    def update(self, latency: float, in_flight: int) -> None:
+        if self.short_latency is None:
+            self.short_latency = self.long_latency = latency
+            return
+        self.short_latency += (latency - self.short_latency) * 2 / (self.SHORT_WINDOW + 1)
+        self.long_latency += (latency - self.long_latency) * 2 / (self.LONG_WINDOW + 1)
+        # Let the baseline catch up quickly once latency drops back
+        if self.long_latency > 2 * self.short_latency:
+            self.long_latency *= 0.95
+
+        # Don't grow while the limit isn't what holds traffic back
+        if in_flight * 2 < self.limit:
+            return
+
+        baseline = max(self.long_latency, self.HEALTHY_LATENCY)
+        gradient = max(0.5, min(1.0, self.TOLERANCE * baseline / max(self.short_latency, self.HEALTHY_LATENCY)))
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit * (1 - self.SMOOTHING) + estimate * self.SMOOTHING
+        self.limit = min(max(limit, self.min_limit), self.max_limit)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: about one upstream call."""
+        return max(1, math.ceil(self.short_latency or 0))
+
+class ConcurrencyLimitMiddleware:
+    """
+    Caps in-flight requests per API router (the path segment after
+    `prefix`, e.g. "transactions") with an AdaptiveLimit each, so a slow
+    upstream shrinks the work admitted instead of letting the threadpool
+    and upstream queue grow. Requests over the limit get an immediate 503
+    with Retry-After. Paths outside the known groups aren't limited.
+
+    Sits inside ServerTimingMiddleware, whose per-request timings give the
+    latency sample: the request's mean upstream call duration as recorded by
+    time_upstream. That tracks PostgREST and auth
+    rather than this process's own load. Requests making no upstream call
+    (e.g. cache hits) don't move the limit. Runs on the event loop only,
+    so the counters need no locking.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        prefix: str,
+        groups: Iterable[str],
+        initial: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 40,
+        budgets: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.prefix = prefix.rstrip("/") + "/"
+        budgets = budgets or {}
+        self.limits: Dict[str, AdaptiveLimit] = {}
+        for group in groups:
+            ceiling = budgets.get(group, max_limit)
+            self.limits[group] = AdaptiveLimit(min(initial, ceiling), min(min_limit, ceiling), ceiling)
+            metrics.concurrency_limit.set(round(self.limits[group].limit), group)
+        self.in_flight: Dict[str, int] = dict.fromkeys(self.limits, 0)
+
+    def _group(self, path: str) -> Optional[str]:
+        if not path.startswith(self.prefix):
+            return None
+        group = path[len(self.prefix):].split("/", 1)[0]
+        return group if group in self.limits else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = self._group(scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits[group]
+        if self.in_flight[group] >= limit.limit:
+            metrics.concurrency_rejections_total.inc(group)
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(limit.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight[group] += 1
+        metrics.concurrency_in_flight.inc(group)
+        with timing.collecting() as timings:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.in_flight[group] -= 1
+                metrics.concurrency_in_flight.dec(group)
+                calls = sum(timings.calls.get(name, 0) for name in timing.UPSTREAM)
+                if calls:
+                    upstream = sum(timings.durations.get(name, 0.0) for name in timing.UPSTREAM)
+                    limit.update(upstream / calls, self.in_flight[group] + 1)
+                    metrics.concurrency_limit.set(round(limit.limit), group)
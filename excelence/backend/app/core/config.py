@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -14,10 +15,103 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+
+    # Verify bearer JWTs locally with SECRET_KEY (must be the Supabase JWT secret)
+    # and only fall back to supabase.auth.get_user when that fails.
+    AUTH_LOCAL_JWT: bool = False
+    JWT_AUDIENCE: str = "authenticated"
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+    AUTH_CACHE_TTL_SECONDS: int = 300
     
     SUPABASE_URL: str
     SUPABASE_KEY: str
+    # Serve requests through one shared async client instead of the sync one
+    SUPABASE_ASYNC: bool = False
+    # Pool of per-user clients handed out by get_supabase_client(access_token)
+    RLS_CLIENT_POOL_SIZE: int = 256
+    RLS_CLIENT_TTL_SECONDS: int = 3600
+    # Evicted clients may still be in use by a request, so their HTTP
+    # sessions are closed this long after eviction
+    RLS_CLIENT_CLOSE_DELAY_SECONDS: int = 300
     
+    # Where transactions, categories and summaries are stored: "supabase", or
+    # "sqlite" for a single node without Supabase (auth still uses Supabase
+    # unless AUTH_LOCAL_JWT is enabled)
+    STORAGE_BACKEND: str = "supabase"
+    # Not excelence.db, the legacy database tracked in git
+    SQLITE_PATH: str = "excelence-local.sqlite3"
+
+    # Per-user cache of dashboard aggregates, invalidated on every write;
+    # the TTL bounds staleness from writes handled by other processes.
+    DASHBOARD_CACHE_MAX_SIZE: int = 10_000
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    # Users whose data versions are remembered (least recently used evicted)
+    DATA_VERSIONS_MAX_USERS: int = 100_000
+
+    # Longest period axis /dashboard/timeseries will build
+    TIMESERIES_MAX_PERIODS: int = 5000
+
+    # Default JSON response class: "auto", "orjson" or "json" (app/core/responses.py)
+    JSON_RESPONSE: str = "auto"
+    # Responses at least this large are gzip/brotli-compressed when accepted
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Request/upstream latency histograms, served on /metrics to requests
+    # with "Authorization: Bearer <METRICS_TOKEN>"; without a token set,
+    # /metrics is not served
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+    # Server-Timing response header with auth/db/serialize durations
+    SERVER_TIMING_ENABLED: bool = True
+    # Log and count event loop stalls longer than this; 0 turns the monitor off
+    LOOP_STALL_THRESHOLD_MS: int = 250
+
+    # Adaptive per-router limit on in-flight requests (app/core/concurrency.py);
+    # requests over it get a 503 with Retry-After
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_LIMIT_INITIAL: int = 20
+    CONCURRENCY_LIMIT_MIN: int = 4
+    CONCURRENCY_LIMIT_MAX: int = 40
+    # Lower ceilings for heavy routers - comma-separated router=limit pairs
+    CONCURRENCY_BUDGETS: str = "export=8,import=4"
+
+    # Retries of idempotent upstream reads after transient failures, with
+    # jittered exponential backoff (app/core/upstream.py)
+    UPSTREAM_RETRIES: int = 2
+    UPSTREAM_RETRY_BASE_MS: int = 50
+    UPSTREAM_RETRY_MAX_MS: int = 1000
+    # Consecutive transient failures that open an upstream's circuit, and
+    # how long calls then fail fast before one is tried again
+    UPSTREAM_BREAKER_THRESHOLD: int = 5
+    UPSTREAM_BREAKER_RESET_SECONDS: int = 10
+
+    # Results kept for replaying requests sent again with the same
+    # Idempotency-Key (app/core/idempotency.py)
+    IDEMPOTENCY_MAX_KEYS: int = 10_000
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+
+    # In-memory search indexes of users' transactions (/transactions/search),
+    # bounded by the transactions indexed in total (roughly 0.5 KB each, so
+    # about 100 MB at the default).
+    # Least recently searched users are evicted first; users with more
+    # transactions than this get a 400 from search instead. Writes
+    # through this process update them; the TTL bounds staleness from
+    # writes handled by other processes.
+    SEARCH_INDEX_MAX_ROWS: int = 200_000
+    SEARCH_INDEX_TTL_SECONDS: int = 600
+
+    # Rows fetched per upstream query when streaming exports
+    EXPORT_PAGE_SIZE: int = 1000
+    # Finished XLSX exports larger than this are spooled to disk
+    EXPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+
+    # Rows per bulk insert when importing CSV/XLSX files
+    IMPORT_BATCH_SIZE: int = 500
+    # Maximum number of items in one /transactions/batch request
+    BATCH_MAX_ITEMS: int = 1000
+
     # CORS origins - comma-separated list
     CORS_ORIGINS: str = "http://localhost:5173"
     
@@ -25,6 +119,11 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def concurrency_budgets(self) -> dict[str, int]:
+        pairs = (item.split("=") for item in self.CONCURRENCY_BUDGETS.split(",") if item.strip())
+        return {name.strip(): int(limit) for name, limit in pairs}
+
     @property
     def frontend_url(self) -> str:
         """Get the first CORS origin as the primary frontend URL for redirects."""
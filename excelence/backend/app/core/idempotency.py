@@ -0,0 +1,127 @@
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+T = TypeVar("T")
+
+MAX_KEY_LENGTH = 255
+# Set on responses that are replays of an earlier request's result
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+class IdempotencyStore:
+    """
+    Results of recent requests that carried an Idempotency-Key, so a client
+    retrying after a lost response gets the original result instead of a
+    second row. Keys are scoped by the caller (e.g. user and endpoint) and
+    tied to a fingerprint of the request body; reusing one with a different
+    body is a 422. A retry arriving while the first attempt is still running
+    gets a 409. Failed requests aren't stored, so they can be retried; nor
+    are results `store_if` rejects (e.g. a batch with items that hit an
+    upstream outage).
+
+    Per process: with several workers a retry can land on one that hasn't
+    seen the key. Entries expire after `ttl` and the oldest are evicted
+    past `max_size`.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.results = TTLCache(max_size=max_size, ttl=ttl)
+        self._pending: set = set()
+        self._lock = threading.Lock()
+
+    def _claim(self, key: Hashable, fingerprint: str) -> Optional[tuple]:
+        """The stored (fingerprint, result) for `key`, or None after claiming it."""
+        with self._lock:
+            stored = self.results.get(key)
+            if stored is None:
+                if key in self._pending:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="A request with this Idempotency-Key is still being processed.",
+                        headers={"Retry-After": "1"},
+                    )
+                self._pending.add(key)
+                return None
+        if stored[0] != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="This Idempotency-Key was already used with a different request.",
+            )
+        return stored
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            self._pending.discard(key)
+
+    def _store(self, key: Hashable, fingerprint: str, result: Any) -> None:
+        with self._lock:
+            self._pending.discard(key)
+            self.results.set(key, (fingerprint, result))
+
+    async def run(
+        self,
+        key: Optional[Hashable],
+        payload: BaseModel,
+        response: Response,
+        fn: Callable[[], Awaitable[T]],
+        store_if: Callable[[T], bool] = lambda result: True,
+    ) -> T:
+        """Returns `await fn()`, or the stored result of the request that first used `key`."""
+        if key is None:
+            return await fn()
+        fingerprint = _fingerprint(payload)
+        stored = self._claim(key, fingerprint)
+        if stored is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+            return stored[1]
+        try:
+            result = await fn()
+        except BaseException:
+            self._release(key)
+            raise
+        if store_if(result):
+            self._store(key, fingerprint, result)
+        else:
+            self._release(key)
+        return result
+
+    def run_sync(self, key: Optional[Hashable], payload: BaseModel, response: Response, fn: Callable[[], T]) -> T:
+        """run() for sync endpoints."""
+        if key is None:
+            return fn()
+        fingerprint = _fingerprint(payload)
+        stored = self._claim(key, fingerprint)
+        if stored is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+            return stored[1]
+        try:
+            result = fn()
+        except BaseException:
+            self._release(key)
+            raise
+        self._store(key, fingerprint, result)
+        return result
+
+def _fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+def scoped_key(idempotency_key: Optional[str], *scope: Hashable) -> Optional[tuple]:
+    """The store key for a request's Idempotency-Key header, or None without one."""
+    if idempotency_key is None:
+        return None
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.",
+        )
+    return (*scope, idempotency_key)
+
+idempotent_requests = IdempotencyStore(
+    max_size=settings.IDEMPOTENCY_MAX_KEYS,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames of the blocked loop thread included in the log
+STACK_DEPTH = 12
+
+# The request each task is serving, for attributing a stall to a route
+_requests: "weakref.WeakKeyDictionary[asyncio.Task, Scope]" = weakref.WeakKeyDictionary()
+
+class LoopMonitorMiddleware:
+    """Remembers which request the current task serves."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if scope["type"] == "http" and task is not None:
+            _requests[task] = scope
+        await self.app(scope, receive, send)
+
+class LoopMonitor:
+    """
+    Watches the event loop for callbacks that hold it too long, e.g. a sync
+    Supabase call made from an `async def` handler.
+
+    A heartbeat scheduled on the loop every `interval` records the loop lag
+    (how late it ran). A watchdog thread notices when the heartbeat is more
+    than `threshold` overdue, while the loop is still blocked, and logs the
+    loop thread's stack and the route of the task holding it. Costs one
+    timer callback per interval on the loop.
+    """
+
+    def __init__(self, threshold: float, interval: Optional[float] = None):
+        self.threshold = threshold
+        self.interval = interval if interval is not None else min(threshold / 2, 0.1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._due = 0.0
+        self._reported_due = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Must be called from the loop's thread, e.g. in the app lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._due = time.monotonic() + self.interval
+        self._handle = self._loop.call_later(self.interval, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        metrics.event_loop_lag_seconds.observe(max(now - self._due, 0.0))
+        self._due = now + self.interval
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            due = self._due
+            blocked = time.monotonic() - due
+            if blocked > self.threshold and due != self._reported_due:
+                # Once per stall: the next heartbeat moves `due` on
+                self._reported_due = due
+                self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        task = asyncio.current_task(self._loop)
+        scope = _requests.get(task) if task is not None else None
+        route = metrics.route_template(scope) if scope is not None else "<no request>"
+        metrics.event_loop_stalls_total.inc(route)
+
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)[-STACK_DEPTH:]) if frame is not None else ""
+        request = f"{scope['method']} {scope['path']}" if scope is not None else "no request"
+        logger.warning(
+            "Event loop blocked for over %.0f ms (%s, route %s)\n%s",
+            blocked * 1000, request, route, stack,
+        )
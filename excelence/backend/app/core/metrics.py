@@ -0,0 +1,244 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core import timing
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(values)]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; observe() costs a bisect and three additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return entry[2] if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = []
+        for labels, (counts, total, count) in sorted(values):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",)
+)
+upstream_request_duration_seconds = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to the storage backend and Supabase auth by operation.",
+    ("op",),
+)
+upstream_errors_total = Counter(
+    "upstream_errors_total", "Calls to the storage backend and Supabase auth that raised.", ("op",)
+)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer scheduled by the loop monitor.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+event_loop_stalls_total = Counter(
+    "event_loop_stalls_total",
+    "Times the event loop was blocked past the stall threshold, by the route holding it.",
+    ("route",),
+)
+concurrency_limit = Gauge(
+    "concurrency_limit", "Current adaptive in-flight request limit by API router.", ("group",)
+)
+concurrency_in_flight = Gauge(
+    "concurrency_in_flight", "Requests admitted by the concurrency limiter and not yet finished.", ("group",)
+)
+concurrency_rejections_total = Counter(
+    "concurrency_rejections_total", "Requests rejected with 503 by the concurrency limiter.", ("group",)
+)
+upstream_retries_total = Counter(
+    "upstream_retries_total", "Upstream calls retried after a transient failure.", ("op",)
+)
+circuit_breaker_state = Gauge(
+    "circuit_breaker_state", "Upstream circuit breaker state: 0 closed, 1 half-open, 2 open.", ("upstream",)
+)
+
+REGISTRY: List[_Metric] = [
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    upstream_request_duration_seconds,
+    upstream_errors_total,
+    event_loop_lag_seconds,
+    event_loop_stalls_total,
+    concurrency_limit,
+    concurrency_in_flight,
+    concurrency_rejections_total,
+    upstream_retries_total,
+    circuit_breaker_state,
+]
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def time_upstream(op: str) -> Iterator[None]:
+    """
+    Records how long the wrapped upstream call took under `op`, and adds
+    it to the request's Server-Timing `auth` or `db` metric.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        upstream_errors_total.inc(op)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        upstream_request_duration_seconds.observe(elapsed, op)
+        timing.record("auth" if op.startswith("auth.") else "db", elapsed)
+
+def route_template(scope: Scope) -> str:
+    """
+    The matched route with its path parameters put back, e.g.
+    /api/v1/transactions/{transaction_id}. Included routers only know their
+    path relative to the prefix, so this is rebuilt from the request path.
+    """
+    if "endpoint" not in scope:
+        return "<unmatched>"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not names:
+        return scope["path"]
+    return "/".join(
+        "{" + names[segment] + "}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+class MetricsMiddleware:
+    """
+    Records latency, status and in-flight requests for every HTTP request.
+    Requests are labelled with their route template so label cardinality
+    stays bounded; requests that match no route share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec(method)
+            # The router records the match in the shared scope
+            route = route_template(scope)
+            http_request_duration_seconds.observe(elapsed, method, route)
+            http_requests_total.inc(method, route, status)
@@ -0,0 +1,32 @@
+import time
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a Supabase access token locally (signature, expiry, audience)
+    and return its claims. Raises jose.JWTError on any failure.
+    """
+    return jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+        audience=settings.JWT_AUDIENCE,
+        options={"require_exp": True, "require_sub": True},
+    )
+
+
+def seconds_until_expiry(token: str) -> Optional[float]:
+    """
+    Remaining lifetime of a token according to its (unverified) `exp` claim,
+    or None if it has none. Only use this to bound cache lifetimes.
+    """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    return float(exp) - time.time() if exp is not None else None
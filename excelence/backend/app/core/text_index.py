@@ -0,0 +1,153 @@
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+
+# Match weights: the whole word, a word it starts, one or two typos away
+EXACT, PREFIX, ONE_TYPO, TWO_TYPOS = 4, 3, 2, 1
+# Shortest term that matches as a prefix, and most words one prefix expands to
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words with accents removed: "Café Noël" -> ["cafe", "noel"]."""
+    if not text:
+        return []
+    text = text.casefold()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+def _words(text: str) -> Tuple[str, ...]:
+    # Interned, so postings keys and every document's words share one string
+    return tuple(sys.intern(word) for word in set(tokenize(text)))
+
+def trigrams(word: str) -> Set[str]:
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_typos(term: str) -> int:
+    # A number with a typo is just another number
+    if term.isdigit():
+        return 0
+    return 0 if len(term) < 4 else 1 if len(term) < 8 else 2
+
+def _index_trigrams(index: Dict[str, Set[str]], word: str) -> None:
+    if not word.isdigit():
+        for gram in trigrams(word):
+            index.setdefault(gram, set()).add(word)
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions
+    and adjacent transpositions), or limit + 1 once it exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        # A transposition can reach back two rows
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+    return current[-1]
+
+class TextIndex:
+    """
+    Inverted index from words to the documents containing them, with prefix
+    and typo-tolerant lookup. The vocabulary is kept sorted for prefix
+    ranges, and indexed by trigram so typo candidates are found without
+    comparing the term with every word. Postings are lists, which take a
+    fraction of a set's memory; a document is in a word's list once. Not
+    thread-safe.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, List[Hashable]] = {}
+        self.doc_words: Dict[Hashable, Tuple[str, ...]] = {}
+        self.vocabulary: List[str] = []
+        self.trigram_words: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[Hashable, str]]) -> "TextIndex":
+        """An index of many (doc_id, text) pairs, sorting the vocabulary once."""
+        index = cls()
+        for doc_id, text in docs:
+            words = index.doc_words[doc_id] = _words(text)
+            for word in words:
+                index.postings.setdefault(word, []).append(doc_id)
+        index.vocabulary = sorted(index.postings)
+        for word in index.vocabulary:
+            _index_trigrams(index.trigram_words, word)
+        return index
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Indexes `doc_id` under the words of `text`, replacing what it had."""
+        self.remove(doc_id)
+        words = self.doc_words[doc_id] = _words(text)
+        for word in words:
+            docs = self.postings.get(word)
+            if docs is None:
+                docs = self.postings[word] = []
+                insort(self.vocabulary, word)
+                _index_trigrams(self.trigram_words, word)
+            docs.append(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        for word in self.doc_words.pop(doc_id, ()):
+            docs = self.postings[word]
+            docs.remove(doc_id)
+            if docs:
+                continue
+            del self.postings[word]
+            del self.vocabulary[bisect_left(self.vocabulary, word)]
+            if word.isdigit():
+                continue
+            for gram in trigrams(word):
+                words = self.trigram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self.trigram_words[gram]
+
+    def expand(self, term: str) -> Dict[str, int]:
+        """The indexed words `term` matches, with their match weight."""
+        matches = {term: EXACT} if term in self.postings else {}
+
+        if len(term) >= MIN_PREFIX:
+            i = bisect_left(self.vocabulary, term)
+            for word in self.vocabulary[i:i + MAX_EXPANSIONS + 1]:
+                if not word.startswith(term):
+                    break
+                matches.setdefault(word, PREFIX)
+
+        limit = max_typos(term)
+        if limit:
+            grams = trigrams(term)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.trigram_words.get(gram, ()))
+            # Each typo changes at most four trigrams (a transposition)
+            needed = len(grams) - 4 * limit
+            for word, count in shared.items():
+                if count >= needed and word not in matches:
+                    distance = edit_distance(term, word, limit)
+                    if distance <= limit:
+                        matches[word] = ONE_TYPO if distance == 1 else TWO_TYPOS
+        return matches
+
+    def search(self, term: str) -> Dict[Hashable, int]:
+        """Documents matching `term`, with the weight of their best matching word."""
+        scores: Dict[Hashable, int] = {}
+        # Lowest weights first, so better matches overwrite them
+        for word, weight in sorted(self.expand(term).items(), key=lambda item: item[1]):
+            scores.update(dict.fromkeys(self.postings[word], weight))
+        return scores
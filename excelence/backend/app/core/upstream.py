@@ -0,0 +1,191 @@
+import asyncio
+import math
+import random
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from app.core import metrics
+from app.core.config import settings
+
+# Operations that are safe to repeat. The RPCs (category usage and the
+# dashboard reports) only read.
+IDEMPOTENT_OPS = ("select", "rpc", "auth.get_user")
+
+# SQLSTATE classes and PostgREST codes for failures that say nothing about
+# the request itself: lost connections, resource exhaustion, shutdowns, and
+# PostgREST being unable to reach the database
+TRANSIENT_CODES = ("08", "53", "57P", "PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+class UpstreamUnavailable(HTTPException):
+    """
+    The storage backend or Supabase auth can't serve the call right now:
+    its circuit is open, or transient failures outlasted the retries.
+    Endpoints let it through as a 503 rather than wrapping it in a 400.
+    """
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"The {upstream} service is temporarily unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether `exc` is a network or availability failure worth retrying."""
+    # Modules that were never imported can't have raised anything
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    postgrest = sys.modules.get("postgrest.exceptions")
+    if postgrest is not None and isinstance(exc, postgrest.APIError):
+        # Non-JSON responses (e.g. a 502 from the gateway) carry the HTTP status
+        if isinstance(exc.code, int):
+            return exc.code >= 500
+        return str(exc.code or "").startswith(TRANSIENT_CODES)
+    gotrue = sys.modules.get("gotrue.errors")
+    if gotrue is not None:
+        if isinstance(exc, gotrue.AuthRetryableError):
+            return True
+        if isinstance(exc, gotrue.AuthApiError):
+            return exc.status >= 500
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc)
+        return "locked" in message or "busy" in message
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an upstream is down. After `failure_threshold`
+    consecutive transient failures the circuit opens and calls raise
+    UpstreamUnavailable without being made. After `reset_timeout` one trial
+    call is let through (half-open): success closes the circuit, a transient
+    failure opens it again.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    # circuit_breaker_state values
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        metrics.circuit_breaker_state.set(0, name)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.circuit_breaker_state.set(self.STATE_VALUES[state], self.name)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+        raise UpstreamUnavailable(self.name, remaining)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def release(self) -> None:
+        """For a call that ended without an outcome, e.g. was cancelled."""
+        with self._lock:
+            self._trial_running = False
+
+breakers = {
+    name: CircuitBreaker(name, settings.UPSTREAM_BREAKER_THRESHOLD, settings.UPSTREAM_BREAKER_RESET_SECONDS)
+    for name in ("database", "auth")
+}
+
+def _breaker(op: str) -> CircuitBreaker:
+    return breakers["auth" if op.startswith("auth.") else "database"]
+
+def _attempts(op: str, retry: Optional[bool]) -> int:
+    if retry is None:
+        retry = op in IDEMPOTENT_OPS
+    return settings.UPSTREAM_RETRIES + 1 if retry else 1
+
+def backoff(attempt: int) -> float:
+    """Seconds to wait before retry `attempt` (0-based): full jitter over an exponential cap."""
+    cap = min(settings.UPSTREAM_RETRY_MAX_MS, settings.UPSTREAM_RETRY_BASE_MS * 2 ** attempt)
+    return random.uniform(0, cap) / 1000
+
+def _failed(breaker: CircuitBreaker, op: str, exc: Exception, last_attempt: bool) -> None:
+    """Counts a failed attempt; raises unless the call should be retried."""
+    if not is_transient(exc):
+        # The upstream answered; the request itself was at fault
+        breaker.record_success()
+        raise exc
+    breaker.record_failure()
+    if last_attempt:
+        raise UpstreamUnavailable(breaker.name, breaker.reset_timeout) from exc
+    metrics.upstream_retries_total.inc(op)
+
+async def call(fn: Callable[[], Awaitable[Any]], op: str, retry: Optional[bool] = None) -> Any:
+    """
+    Awaits `fn()` as upstream operation `op`: timed by time_upstream,
+    guarded by the upstream's circuit breaker and, for idempotent
+    operations (or with retry=True), retried with jittered backoff on
+    transient failures. Transient failures that persist raise
+    UpstreamUnavailable; other errors are raised unchanged.
+    """
+    breaker = _breaker(op)
+    attempts = _attempts(op, retry)
+    for attempt in range(attempts):
+        breaker.before_call()
+        try:
+            with metrics.time_upstream(op):
+                result = await fn()
+        except Exception as e:
+            _failed(breaker, op, e, attempt + 1 == attempts)
+            await asyncio.sleep(backoff(attempt))
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+def call_sync(fn: Callable[[], Any], op: str, retry: Optional[bool] = None) -> Any:
+    """call() for sync endpoints, which run in the threadpool."""
+    breaker = _breaker(op)
+    attempts = _attempts(op, retry)
+    for attempt in range(attempts):
+        breaker.before_call()
+        try:
+            with metrics.time_upstream(op):
+                result = fn()
+        except Exception as e:
+            _failed(breaker, op, e, attempt + 1 == attempts)
+            time.sleep(backoff(attempt))
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
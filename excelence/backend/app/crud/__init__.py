@@ -1 +1,2 @@
-from .transactions import delete_transaction, get_summary
\ No newline at end of file
+from .categories import create_categories, list_categories
+from .transactions import delete_transaction, get_summary
@@ -0,0 +1,70 @@
+import hashlib
+import math
+import secrets
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Per-user dashboard results keyed by (user_id, name, data version). A write
+# bumps the version, so older entries are never read again and age out, and a
+# result computed concurrently with a write is stored under the old version.
+dashboard_cache = TTLCache(
+    max_size=settings.DASHBOARD_CACHE_MAX_SIZE,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+)
+
+# Versions restart with the process, so ETags also carry a per-process epoch
+_epoch = secrets.token_hex(8)
+# Bounded so idle users don't accumulate. A user whose version was evicted
+# starts again above every version issued so far, so a version is never
+# reused and results cached under an old one are never read again.
+_data_versions = TTLCache(max_size=settings.DATA_VERSIONS_MAX_USERS, ttl=math.inf)
+_last_version = 0
+_versions_lock = threading.Lock()
+
+def _set_version(key: str, version: int) -> int:
+    """Call with _versions_lock held."""
+    global _last_version
+    _last_version = max(_last_version, version)
+    _data_versions.set(key, version)
+    return version
+
+def data_version(user_id: uuid.UUID) -> int:
+    key = str(user_id)
+    version = _data_versions.get(key)
+    if version is not None:
+        return version
+    with _versions_lock:
+        version = _data_versions.get(key)
+        return version if version is not None else _set_version(key, _last_version + 1)
+
+def invalidate_user_data(user_id: uuid.UUID) -> None:
+    """
+    Called by every write path: bumps the user's data version by one, which
+    makes all cached results for that user stale.
+    """
+    key = str(user_id)
+    with _versions_lock:
+        version = _data_versions.get(key)
+        _set_version(key, (_last_version if version is None else version) + 1)
+
+def get_cached(user_id: uuid.UUID, name: str) -> Optional[Any]:
+    return dashboard_cache.get((str(user_id), name, data_version(user_id)))
+
+def set_cached(user_id: uuid.UUID, name: str, value: Any, version: int) -> None:
+    """`version` is the data_version read before the value was computed."""
+    dashboard_cache.set((str(user_id), name, version), value)
+
+def data_etag(user_id: uuid.UUID) -> str:
+    """
+    Weak ETag for everything readable by the user at the current data
+    version. It also changes every DASHBOARD_CACHE_TTL_SECONDS, which bounds
+    staleness from writes handled by other processes, as for the cache.
+    """
+    window = int(time.time() // max(settings.DASHBOARD_CACHE_TTL_SECONDS, 1))
+    raw = f"{user_id}:{_epoch}:{data_version(user_id)}:{window}"
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
@@ -0,0 +1,84 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from app.crud import search
+from app.crud.cache import data_version, get_cached, invalidate_user_data, set_cached
+from app.repositories import get_repository
+
+async def list_categories(user_id: uuid.UUID, columns: str = '*') -> list[dict]:
+    """
+    Retrieves all categories for a user, ordered by name.
+    """
+    return await get_repository().categories.list(user_id, columns)
+
+async def get_category_usage(user_id: uuid.UUID) -> dict[str, dict]:
+    """
+    transaction_count, last_used, month_income and month_expense (for the
+    current UTC month) keyed by category id, from one grouped query.
+    Categories without transactions are absent. Results are cached per
+    user until the user's data changes.
+    """
+    month_start = datetime.now(timezone.utc).date().replace(day=1)
+    name = f'category_usage:{month_start.isoformat()}'
+    cached = get_cached(user_id, name)
+    if cached is not None:
+        return cached
+
+    version = data_version(user_id)
+    rows = await get_repository().categories.usage(user_id, month_start)
+    usage = {str(row['category_id']): row for row in rows}
+    set_cached(user_id, name, usage, version)
+    return usage
+
+async def create_category(user_id: uuid.UUID, name: str, emoji: Optional[str] = None) -> Optional[dict]:
+    """
+    Creates a category. Returns the created row, or None if nothing was returned.
+    """
+    try:
+        created = await get_repository().categories.create({
+            "name": name,
+            "emoji": emoji,
+            "user_id": str(user_id)
+        })
+    finally:
+        invalidate_user_data(user_id)
+    search.categories_changed(user_id, upserted=[created] if created else [])
+    return created
+
+async def create_categories(user_id: uuid.UUID, names: list[str]) -> list[dict]:
+    """
+    Creates several categories for a user with a single insert.
+    """
+    if not names:
+        return []
+    try:
+        created = await get_repository().categories.create_many([
+            {"name": name, "user_id": str(user_id)} for name in names
+        ])
+    finally:
+        invalidate_user_data(user_id)
+    search.categories_changed(user_id, upserted=created)
+    return created
+
+async def update_category(category_id: uuid.UUID, user_id: uuid.UUID, changes: dict) -> Optional[dict]:
+    """
+    Updates one of a user's categories. Returns the updated row, or None if
+    it was not found.
+    """
+    try:
+        updated = await get_repository().categories.update(category_id, user_id, changes)
+    finally:
+        invalidate_user_data(user_id)
+    search.categories_changed(user_id, upserted=[updated] if updated else [])
+    return updated
+
+async def delete_category(category_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    """
+    Deletes one of a user's categories. Returns False if it was not found.
+    """
+    try:
+        deleted = await get_repository().categories.delete(category_id, user_id)
+    finally:
+        invalidate_user_data(user_id)
+    search.categories_changed(user_id, deleted=[deleted] if deleted else [])
+    return deleted is not None
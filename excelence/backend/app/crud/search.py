@@ -0,0 +1,216 @@
+import asyncio
+import base64
+import binascii
+import heapq
+import sys
+import uuid
+from datetime import date
+from typing import Awaitable, Callable, Iterable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.text_index import TextIndex, tokenize
+from app.crud.cache import data_version
+
+# Most words of a query that are matched
+MAX_TERMS = 10
+
+class TransactionIndex:
+    """
+    One user's transactions, searchable by the words of their description
+    and of their category's name. `version` is the user's data_version the
+    index reflects; writes applied incrementally move it along. Only ids,
+    dates and categories are kept; the rows of a page are fetched by id.
+    """
+
+    def __init__(self, version: int, descriptions: TextIndex, categories: TextIndex):
+        self.version = version
+        # Date ordinal (for ordering ties newest first) and category id by transaction id
+        self.entries: dict[str, tuple[int, str]] = {}
+        self.by_category: dict[str, set[str]] = {}
+        self.descriptions = descriptions
+        self.categories = categories
+
+    @classmethod
+    def build(cls, version: int, rows: list[dict], categories: list[dict]) -> "TransactionIndex":
+        index = cls(
+            version,
+            TextIndex.build((str(row['id']), row.get('description') or '') for row in rows),
+            TextIndex.build((str(c['id']), c['name']) for c in categories),
+        )
+        for row in rows:
+            index._store(row)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _store(self, row: dict) -> None:
+        transaction_id = str(row['id'])
+        category_id = sys.intern(str(row['category_id']))
+        self.entries[transaction_id] = (date.fromisoformat(str(row['date'])[:10]).toordinal(), category_id)
+        self.by_category.setdefault(category_id, set()).add(transaction_id)
+
+    def upsert(self, row: dict) -> None:
+        transaction_id = str(row['id'])
+        self.remove(transaction_id)
+        self._store(row)
+        self.descriptions.add(transaction_id, row.get('description') or '')
+
+    def remove(self, transaction_id: str) -> None:
+        entry = self.entries.pop(transaction_id, None)
+        if entry is None:
+            return
+        self.by_category[entry[1]].discard(transaction_id)
+        self.descriptions.remove(transaction_id)
+
+    def match(self, terms: list[str]) -> dict[str, int]:
+        """
+        Transactions matching every term in their description or category
+        name, scored by the sum over terms of the best match's weight.
+        """
+        total: Optional[dict[str, int]] = None
+        for term in terms:
+            scores = self.descriptions.search(term)
+            for category_id, weight in self.categories.search(term).items():
+                for transaction_id in self.by_category.get(category_id, ()):
+                    if scores.get(transaction_id, 0) < weight:
+                        scores[transaction_id] = weight
+            if total is None:
+                total = scores
+            else:
+                total = {t: score + scores[t] for t, score in total.items() if t in scores}
+            if not total:
+                return {}
+        return total or {}
+
+# Indexes by user id, bounded by the transactions they hold in total. Writes
+# made through this process are applied as they happen; the TTL bounds
+# staleness from writes handled by other processes.
+indexes = TTLCache(
+    max_size=settings.SEARCH_INDEX_MAX_ROWS,
+    ttl=settings.SEARCH_INDEX_TTL_SECONDS,
+    weigh=len,
+)
+_builds: dict[str, asyncio.Future] = {}
+# Data version by user id of histories found to be too large to index, so
+# searches fail fast until the user's data changes
+too_large = TTLCache(max_size=10_000, ttl=settings.SEARCH_INDEX_TTL_SECONDS)
+
+class HistoryTooLarge(ValueError):
+    """Raised by loaders once a history holds more transactions than an index may."""
+
+    def __init__(self):
+        super().__init__(f"Search is not available for more than {indexes.max_size} transactions")
+
+Loader = Callable[[], Awaitable[tuple[list[dict], list[dict]]]]
+
+async def _build(user_id: uuid.UUID, load: Loader) -> TransactionIndex:
+    version = data_version(user_id)
+    try:
+        rows, categories = await load()
+    except HistoryTooLarge:
+        too_large.set(str(user_id), version)
+        raise
+    # Tokenizing a long history would hold up the event loop
+    index = await run_in_threadpool(TransactionIndex.build, version, rows, categories)
+    indexes.set(str(user_id), index)
+    return index
+
+async def get_index(user_id: uuid.UUID, load: Loader) -> TransactionIndex:
+    """
+    The user's index, built from `load()` (all transactions and categories)
+    if there is none or it missed a write. Concurrent searches share one build.
+    `load()` must raise HistoryTooLarge once it has read more than
+    `indexes.max_size` transactions; the user's searches then raise it
+    without loading again until their data changes.
+    """
+    key = str(user_id)
+    index = indexes.get(key)
+    if index is not None and index.version == data_version(user_id):
+        return index
+    if too_large.get(key) == data_version(user_id):
+        raise HistoryTooLarge()
+    build = _builds.get(key)
+    if build is None:
+        build = _builds[key] = asyncio.ensure_future(_build(user_id, load))
+        build.add_done_callback(lambda _: _builds.pop(key, None))
+    return await asyncio.shield(build)
+
+def _current_index(user_id: uuid.UUID) -> Optional[TransactionIndex]:
+    """
+    The index to apply a write to, which has just bumped the data version.
+    An index that is behind by more than this write is dropped instead.
+    """
+    key = str(user_id)
+    index = indexes.get(key)
+    if index is None:
+        return None
+    if index.version != data_version(user_id) - 1:
+        indexes.pop(key)
+        return None
+    index.version += 1
+    return index
+
+def transactions_changed(user_id: uuid.UUID, upserted: Iterable[dict] = (), deleted: Iterable[dict] = ()) -> None:
+    """Applies a successful transaction write; call right after invalidate_user_data."""
+    index = _current_index(user_id)
+    if index is None:
+        return
+    for row in deleted:
+        index.remove(str(row['id']))
+    for row in upserted:
+        index.upsert(row)
+    indexes.reweigh(str(user_id))
+
+def categories_changed(user_id: uuid.UUID, upserted: Iterable[dict] = (), deleted: Iterable[dict] = ()) -> None:
+    """Applies a successful category write; call right after invalidate_user_data."""
+    index = _current_index(user_id)
+    if index is None:
+        return
+    for row in deleted:
+        index.categories.remove(str(row['id']))
+    for row in upserted:
+        index.categories.add(str(row['id']), row['name'])
+
+def query_terms(q: str) -> list[str]:
+    terms = list(dict.fromkeys(tokenize(q)))[:MAX_TERMS]
+    if not terms:
+        raise ValueError("The search query must contain letters or digits")
+    return terms
+
+def encode_cursor(score: int, day: int, transaction_id: str) -> str:
+    """Opaque keyset cursor pointing just past a result in ranked order."""
+    raw = f"{score}|{date.fromordinal(day).isoformat()}|{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[int, int, str]:
+    """The cursor's position as a sort key: (-score, -day, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, row_date, row_id = raw.split("|")
+        return -int(score), -date.fromisoformat(row_date).toordinal(), str(uuid.UUID(row_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def ranked_page(
+    index: TransactionIndex, terms: list[str], limit: int, cursor: Optional[str] = None
+) -> tuple[list[str], Optional[str]]:
+    """
+    A page of matching transaction ids, best score first and newest first
+    among equal scores, keyset-paginated like list_transactions. Returns
+    the ids and the cursor for the next page (None on the last page).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    keys = ((-score, -index.entries[t][0], t) for t, score in index.match(terms).items())
+    if after is not None:
+        keys = (key for key in keys if key > after)
+    # Only the page is sorted, not every match
+    page = heapq.nsmallest(limit + 1, keys)
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        score, day, transaction_id = page[-1]
+        next_cursor = encode_cursor(-score, -day, transaction_id)
+    return [t for _, _, t in page], next_cursor
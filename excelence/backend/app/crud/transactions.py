@@ -1,58 +1,328 @@
+import base64
+import binascii
 import uuid
-from app.db.session import supabase
+from datetime import date, timedelta
+from typing import AsyncIterator, Optional
 
-def delete_transaction(transaction_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+from app.core.config import settings
+from app.crud import search
+from app.crud.cache import data_version, get_cached, invalidate_user_data, set_cached
+from app.crud.categories import list_categories
+from app.repositories import get_repository
+from app.schemas import TransactionFilter
+
+def encode_cursor(row: dict) -> str:
+    """Opaque keyset cursor pointing just past `row` in (date, id) order."""
+    raw = f"{row['date']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        row_date, row_id = raw.split("|")
+        return date.fromisoformat(row_date).isoformat(), str(uuid.UUID(row_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+async def list_transactions(
+    user_id: uuid.UUID,
+    filters: Optional[TransactionFilter] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    columns: str = '*',
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Lists a user's transactions newest first, keyset-paginated on (date, id).
+    Returns the page and the cursor for the next one (None on the last page).
+    Without a limit every matching row is returned in one page. Paginated
+    rows always include date and id, whatever the selected columns.
+    """
+    if limit is not None and columns != '*':
+        # The cursor is built from the last row's date and id
+        selected = {c.strip() for c in columns.split(',')}
+        columns = ', '.join([columns, *(c for c in ('date', 'id') if c not in selected)])
+    rows = await get_repository().transactions.list(
+        user_id,
+        filters=filters,
+        # Fetch one extra row to learn whether another page exists
+        limit=limit + 1 if limit is not None else None,
+        after=decode_cursor(cursor) if cursor else None,
+        columns=columns,
+    )
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+async def create_transactions(rows: list[dict]) -> list[dict]:
+    """
+    Inserts several transactions with a single upstream call.
+    Returns the created rows.
+    """
+    if not rows:
+        return []
+    try:
+        created = await get_repository().transactions.create_many(rows)
+    finally:
+        for user_id in {row['user_id'] for row in rows}:
+            invalidate_user_data(user_id)
+    for user_id in {row['user_id'] for row in rows}:
+        search.transactions_changed(user_id, upserted=[row for row in created if str(row['user_id']) == str(user_id)])
+    return created
+
+async def create_transaction(row: dict) -> Optional[dict]:
+    """
+    Inserts one transaction. Returns the created row, or None if nothing was returned.
+    """
+    try:
+        created = await get_repository().transactions.create(row)
+    finally:
+        invalidate_user_data(row['user_id'])
+    search.transactions_changed(row['user_id'], upserted=[created] if created else [])
+    return created
+
+async def update_transaction(transaction_id: uuid.UUID, user_id: uuid.UUID, changes: dict) -> Optional[dict]:
+    """
+    Updates one of a user's transactions. Returns the updated row, or None
+    if it was not found.
+    """
+    try:
+        updated = await get_repository().transactions.update(transaction_id, user_id, changes)
+    finally:
+        invalidate_user_data(user_id)
+    search.transactions_changed(user_id, upserted=[updated] if updated else [])
+    return updated
+
+async def delete_transaction(transaction_id: uuid.UUID, user_id: uuid.UUID) -> bool:
     """
     Deletes a transaction by its ID for a specific user.
     Returns True if deletion was successful (record found and deleted), False otherwise.
     """
-    response = supabase.table('transactions').delete().match({
-        'id': str(transaction_id),
-        'user_id': str(user_id)
-    }).execute()
+    try:
+        deleted = await get_repository().transactions.delete(transaction_id, user_id)
+    finally:
+        invalidate_user_data(user_id)
+    search.transactions_changed(user_id, deleted=[deleted] if deleted else [])
 
-    if response.data:
+    if deleted:
         return True
     return False
 
-def get_summary(user_id: uuid.UUID) -> dict:
+async def iter_transaction_pages(
+    user_id: uuid.UUID,
+    page_size: int,
+    filters: Optional[TransactionFilter] = None,
+    columns: str = '*',
+) -> AsyncIterator[list[dict]]:
     """
-    Retrieves the financial summary for a user by calling a database function.
-    This performs the aggregation at the database level for better performance.
+    Yields all of a user's transactions page by page, so callers never hold
+    more than one page in memory.
     """
-    response = supabase.rpc(
-        'get_user_financial_summary',
-        {'p_user_id': str(user_id)}
-    ).execute()
+    cursor = None
+    while True:
+        rows, cursor = await list_transactions(
+            user_id, filters=filters, limit=page_size, cursor=cursor, columns=columns
+        )
+        if rows:
+            yield rows
+        if cursor is None:
+            return
 
-    if response.data:
-        # RPC returns a list, we expect a single result object
-        return response.data[0]
-    
-    # Return a zero-summary if there's no data
-    return {
-        "total_income": 0,
-        "total_expenses": 0,
-        "net_balance": 0
-    }
+async def update_transactions(ids: list[uuid.UUID], user_id: uuid.UUID, changes: dict) -> list[dict]:
+    """
+    Applies the same changes to several of a user's transactions in one call.
+    Returns the rows that were found and updated.
+    """
+    if not ids:
+        return []
+    try:
+        updated = await get_repository().transactions.update_many(ids, user_id, changes)
+    finally:
+        invalidate_user_data(user_id)
+    search.transactions_changed(user_id, upserted=updated)
+    return updated
 
-def get_expenses_by_category(user_id: uuid.UUID) -> list[dict]:
+async def delete_transactions(ids: list[uuid.UUID], user_id: uuid.UUID) -> list[dict]:
+    """
+    Deletes several of a user's transactions in one call.
+    Returns the rows that were found and deleted.
+    """
+    if not ids:
+        return []
+    try:
+        deleted = await get_repository().transactions.delete_many(ids, user_id)
+    finally:
+        invalidate_user_data(user_id)
+    search.transactions_changed(user_id, deleted=deleted)
+    return deleted
+
+async def search_transactions(
+    user_id: uuid.UUID,
+    q: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    A user's transactions whose description or category name matches every
+    word of `q`, allowing prefixes and typos, best matches first. Served
+    from an in-memory index of the user's history (app/crud/search.py),
+    built on first use and kept up to date by the write functions here.
+    Histories larger than SEARCH_INDEX_MAX_ROWS raise search.HistoryTooLarge.
+    Returns the page and the cursor for the next one, like list_transactions.
+    """
+    terms = search.query_terms(q)
+
+    async def load() -> tuple[list[dict], list[dict]]:
+        categories = await list_categories(user_id, columns='id, name')
+        rows = []
+        async for page in iter_transaction_pages(
+            user_id, page_size=settings.EXPORT_PAGE_SIZE, columns='id, date, description, category_id'
+        ):
+            rows.extend(page)
+            # Stop reading a history the index could not keep anyway
+            if len(rows) > search.indexes.max_size:
+                raise search.HistoryTooLarge()
+        return rows, categories
+
+    index = await search.get_index(user_id, load)
+    ids, next_cursor = search.ranked_page(index, terms, limit, cursor)
+    if not ids:
+        return [], next_cursor
+    rows = {str(row['id']): row for row in await get_repository().transactions.get_many(ids, user_id)}
+    # Rows deleted by another process since the index was built are skipped
+    return [rows[i] for i in ids if i in rows], next_cursor
+
+async def get_summary(user_id: uuid.UUID) -> dict:
+    """
+    Retrieves the financial summary for a user. The aggregation is performed
+    by the storage backend (a database function on Supabase).
+    Results are cached per user until the user's data changes.
+    """
+    cached = get_cached(user_id, 'summary')
+    if cached is not None:
+        return cached
+
+    version = data_version(user_id)
+    summary = await get_repository().summaries.financial_summary(user_id)
+
+    if not summary:
+        # Return a zero-summary if there's no data
+        summary = {
+            "total_income": 0,
+            "total_expenses": 0,
+            "net_balance": 0
+        }
+    set_cached(user_id, 'summary', summary, version)
+    return summary
+
+async def get_expenses_by_category(user_id: uuid.UUID) -> list[dict]:
     """
     Retrieves the expenses aggregated by category for a user.
+    Results are cached per user until the user's data changes.
+    """
+    cached = get_cached(user_id, 'expenses_by_category')
+    if cached is not None:
+        return cached
+
+    version = data_version(user_id)
+    rows = await get_repository().summaries.expenses_by_category(user_id)
+
+    # Convert numeric types to float for JSON serialization
+    expenses = [
+        {
+            'category_name': item['category_name'],
+            'total_amount': float(item['total_amount'])
+        }
+        for item in rows
+    ]
+    set_cached(user_id, 'expenses_by_category', expenses, version)
+    return expenses
+
+
+GRANULARITIES = ('day', 'week', 'month')
+GROUP_BYS = ('category', 'type')
+
+def period_start(d: date, granularity: str) -> date:
+    """First day of the day/week/month containing `d`; weeks start on Monday."""
+    if granularity == 'week':
+        return d - timedelta(days=d.weekday())
+    if granularity == 'month':
+        return d.replace(day=1)
+    return d
+
+def next_period(d: date, granularity: str) -> date:
+    if granularity == 'week':
+        return d + timedelta(days=7)
+    if granularity == 'month':
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+def count_periods(start: date, end: date, granularity: str) -> int:
+    if granularity == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return (end - start).days // (7 if granularity == 'week' else 1) + 1
+
+def check_periods(start: date, end: date, granularity: str) -> None:
+    if count_periods(start, end, granularity) > settings.TIMESERIES_MAX_PERIODS:
+        raise ValueError(
+            f"Range spans more than {settings.TIMESERIES_MAX_PERIODS} periods; use a coarser granularity."
+        )
+
+async def get_timeseries(
+    user_id: uuid.UUID,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    granularity: str,
+    group_by: str,
+) -> dict:
     """
-    response = supabase.rpc(
-        'get_expenses_by_category',
-        {'p_user_id': str(user_id)}
-    ).execute()
-
-    if response.data:
-        # Convert numeric types to float for JSON serialization
-        return [
-            {
-                'category_name': item['category_name'],
-                'total_amount': float(item['total_amount'])
-            }
-            for item in response.data
-        ]
-    return []
+    Totals per period and group in columnar form: one `periods` axis without
+    gaps and one `values` list per series, largest series first. Grouped by
+    transaction type, or by category for expenses. The aggregation is done
+    by the storage backend; only the pivot happens here.
+    Results are cached per user until the user's data changes.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity '{granularity}'")
+    if group_by not in GROUP_BYS:
+        raise ValueError(f"Invalid group_by '{group_by}'")
+    if date_from and date_to:
+        if date_from > date_to:
+            raise ValueError("'from' must not be after 'to'")
+        # Rejected before the backend aggregates the whole range
+        check_periods(period_start(date_from, granularity), period_start(date_to, granularity), granularity)
+
+    name = f"timeseries:{date_from}:{date_to}:{granularity}:{group_by}"
+    cached = get_cached(user_id, name)
+    if cached is not None:
+        return cached
+
+    version = data_version(user_id)
+    rows = await get_repository().summaries.timeseries(user_id, date_from, date_to, granularity, group_by)
+
+    totals: dict[str, dict[date, float]] = {}
+    for row in rows:
+        period = date.fromisoformat(str(row['period'])[:10])
+        totals.setdefault(row['group_key'], {})[period] = float(row['total_amount'])
+
+    periods: list[date] = []
+    seen = [p for points in totals.values() for p in points]
+    start = period_start(date_from, granularity) if date_from else min(seen, default=None)
+    end = period_start(date_to, granularity) if date_to else max(seen, default=None)
+    if start is not None and end is not None:
+        if not (date_from and date_to):
+            # An open end is only known from the data
+            check_periods(start, end, granularity)
+        period = start
+        while period <= end:
+            periods.append(period)
+            period = next_period(period, granularity)
 
+    series = sorted(
+        ({"name": key, "values": [points.get(p, 0.0) for p in periods]} for key, points in totals.items()),
+        key=lambda s: sum(s["values"]),
+        reverse=True,
+    )
+    timeseries = {"granularity": granularity, "group_by": group_by, "periods": periods, "series": series}
+    set_cached(user_id, name, timeseries, version)
+    return timeseries
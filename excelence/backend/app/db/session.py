@@ -1,19 +1,153 @@
-from supabase import create_client, Client
+import inspect
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core import upstream
+from app.core.security import seconds_until_expiry
+
+if TYPE_CHECKING:
+    from supabase import AClient, Client
+
+# The supabase package takes a third of a second to import, so it is only
+# imported once a client is needed: by the app lifespan when the
+# configuration uses Supabase, or on first use.
+
+# Shared async client, created by the app lifespan when SUPABASE_ASYNC is enabled
+async_supabase: Optional["AClient"] = None
+_client_lock = threading.Lock()
+
+def get_client() -> "Client":
+    """The global client with the anon key for public operations, created on first use."""
+    client = globals().get("supabase")
+    if client is None:
+        with _client_lock:
+            client = globals().get("supabase")
+            if client is None:
+                from supabase import create_client
+                client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+                globals()["supabase"] = client
+    return client
+
+def __getattr__(name: str) -> Any:
+    # `session.supabase` keeps working (and can be patched) before the client exists
+    if name == "supabase":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def supabase_needed_at_startup() -> bool:
+    """Whether requests will need a Supabase client, rather than only the auth endpoints."""
+    return settings.STORAGE_BACKEND == "supabase" or not settings.AUTH_LOCAL_JWT
+
+def _close_client(client: "Client") -> None:
+    client.postgrest.aclose()
+    client.auth.close()
+
+# Evicted clients with their eviction time, oldest first. A request may
+# still be using one, so it is closed by a later sweep rather than at once.
+_retired: list[tuple[float, "Client"]] = []
+_retired_lock = threading.Lock()
+
+def _retire_client(access_token: str, client: "Client") -> None:
+    with _retired_lock:
+        _retired.append((time.monotonic(), client))
+
+def close_retired_clients(delay: Optional[float] = None) -> None:
+    """Closes clients evicted at least `delay` (default RLS_CLIENT_CLOSE_DELAY_SECONDS) ago."""
+    cutoff = time.monotonic() - (settings.RLS_CLIENT_CLOSE_DELAY_SECONDS if delay is None else delay)
+    with _retired_lock:
+        due = 0
+        while due < len(_retired) and _retired[due][0] <= cutoff:
+            due += 1
+        closing = [client for _, client in _retired[:due]]
+        del _retired[:due]
+    for client in closing:
+        _close_client(client)
 
-# Global client with anon key for public operations
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+# Per-token clients for RLS-scoped queries. Entries expire with the token's
+# `exp`; evicted ones are retired and closed after a delay.
+rls_clients = TTLCache(
+    max_size=settings.RLS_CLIENT_POOL_SIZE,
+    ttl=settings.RLS_CLIENT_TTL_SECONDS,
+    on_evict=_retire_client,
+)
+_rls_clients_lock = threading.Lock()
 
-def get_supabase_client(access_token: str = None) -> Client:
+def get_supabase_client(access_token: str = None) -> "Client":
     """
     Get a Supabase client with optional user access token for RLS.
     If access_token is provided, it will be used for authenticated requests.
+    Clients are pooled per token, so repeated calls reuse the HTTP session.
     """
     if access_token:
-        # Create a client with the user's JWT token for RLS
-        client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        client.auth.set_session(access_token, access_token)  # Set the user's token
+        close_retired_clients()
+        with _rls_clients_lock:
+            client = rls_clients.get(access_token)
+            if client is None:
+                ttl = seconds_until_expiry(access_token)
+                if ttl is not None and ttl <= 0:
+                    raise ValueError("Access token has expired")
+                # Create a client with the user's JWT token for RLS. Authorizing
+                # PostgREST directly avoids the get_user round trip of set_session.
+                from supabase import create_client
+                client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+                client.postgrest.auth(access_token)
+                rls_clients.set(access_token, client, ttl=ttl)
         return client
-    return supabase
+    return get_client()
 
+def get_db() -> Union["AClient", "Client"]:
+    """
+    The client request handlers should build queries from: the shared async
+    client when async mode is active, otherwise the global sync client.
+    """
+    return async_supabase if async_supabase is not None else get_client()
+
+async def execute(query: Any, op: str = "query") -> Any:
+    """
+    Execute a query/RPC builder without blocking the event loop.
+    Builders from the async client are awaited directly; sync builders run
+    in the threadpool. The call goes through upstream.call under `op`
+    (select/insert/update/delete/rpc): timed, retried if it only reads,
+    and failed fast while the database's circuit is open.
+    """
+    if inspect.iscoroutinefunction(query.execute):
+        return await upstream.call(query.execute, op)
+    return await upstream.call(lambda: run_in_threadpool(query.execute), op)
+
+async def get_user(token: str) -> Any:
+    """Look up the user owning an access token with Supabase auth."""
+    client = get_db()
+    if inspect.iscoroutinefunction(client.auth.get_user):
+        return await upstream.call(lambda: client.auth.get_user(token), "auth.get_user")
+    return await upstream.call(lambda: run_in_threadpool(client.auth.get_user, token), "auth.get_user")
+
+async def init_async_client() -> None:
+    global async_supabase
+    if settings.SUPABASE_ASYNC and async_supabase is None:
+        from supabase import acreate_client
+        async_supabase = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+async def init_clients() -> None:
+    """
+    Called by the app lifespan, so the client requests will use exists
+    before the first one arrives. Configurations that only need Supabase
+    for the auth endpoints create it on first use instead.
+    """
+    if not supabase_needed_at_startup():
+        return
+    if settings.SUPABASE_ASYNC:
+        await init_async_client()
+    else:
+        get_client()
 
+async def close_async_client() -> None:
+    global async_supabase
+    if async_supabase is None:
+        return
+    client, async_supabase = async_supabase, None
+    await client.postgrest.aclose()
+    await client.auth.close()
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from app.core.config import settings
+from .base import CategoryRepository, Repository, SummaryRepository, TransactionRepository
+
+_repository: Optional[Repository] = None
+
+def get_repository() -> Repository:
+    """The storage backend selected by settings.STORAGE_BACKEND, created on first use."""
+    global _repository
+    if _repository is None:
+        if settings.STORAGE_BACKEND == "supabase":
+            from .supabase import SupabaseRepository
+            _repository = SupabaseRepository()
+        elif settings.STORAGE_BACKEND == "sqlite":
+            from .sqlite import SQLiteRepository
+            _repository = SQLiteRepository(settings.SQLITE_PATH)
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'")
+    return _repository
+
+async def close_repository() -> None:
+    global _repository
+    if _repository is not None:
+        repository, _repository = _repository, None
+        await repository.close()
+
+__all__ = [
+    "CategoryRepository",
+    "Repository",
+    "SummaryRepository",
+    "TransactionRepository",
+    "close_repository",
+    "get_repository",
+]
@@ -0,0 +1,103 @@
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Optional
+
+from app.schemas import TransactionFilter
+
+# Position after which a keyset page starts: (ISO date, transaction id)
+KeysetPosition = tuple[str, str]
+
+class TransactionRepository(ABC):
+    @abstractmethod
+    async def list(
+        self,
+        user_id: uuid.UUID,
+        filters: Optional[TransactionFilter] = None,
+        limit: Optional[int] = None,
+        after: Optional[KeysetPosition] = None,
+        columns: str = '*',
+    ) -> List[dict]:
+        """A user's transactions ordered by (date, id) descending."""
+
+    @abstractmethod
+    async def get_many(self, ids: List[uuid.UUID], user_id: uuid.UUID) -> List[dict]:
+        """The user's transactions with these ids, in no particular order."""
+
+    @abstractmethod
+    async def create(self, row: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def create_many(self, rows: List[dict]) -> List[dict]: ...
+
+    @abstractmethod
+    async def update(self, transaction_id: uuid.UUID, user_id: uuid.UUID, changes: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def update_many(self, ids: List[uuid.UUID], user_id: uuid.UUID, changes: dict) -> List[dict]: ...
+
+    @abstractmethod
+    async def delete(self, transaction_id: uuid.UUID, user_id: uuid.UUID) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def delete_many(self, ids: List[uuid.UUID], user_id: uuid.UUID) -> List[dict]: ...
+
+class CategoryRepository(ABC):
+    @abstractmethod
+    async def list(self, user_id: uuid.UUID, columns: str = '*') -> List[dict]:
+        """A user's categories ordered by name."""
+
+    @abstractmethod
+    async def create(self, row: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def create_many(self, rows: List[dict]) -> List[dict]: ...
+
+    @abstractmethod
+    async def update(self, category_id: uuid.UUID, user_id: uuid.UUID, changes: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def delete(self, category_id: uuid.UUID, user_id: uuid.UUID) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def usage(self, user_id: uuid.UUID, month_start: date) -> List[dict]:
+        """
+        category_id, transaction_count, last_used (latest transaction date),
+        month_income and month_expense (sums of income and expense amounts
+        in the month starting at month_start) for each category with
+        transactions, in one grouped query.
+        """
+
+class SummaryRepository(ABC):
+    @abstractmethod
+    async def financial_summary(self, user_id: uuid.UUID) -> Optional[dict]:
+        """total_income, total_expenses and net_balance, or None without data."""
+
+    @abstractmethod
+    async def expenses_by_category(self, user_id: uuid.UUID) -> List[dict]:
+        """category_name and total_amount of expenses, largest first."""
+
+    @abstractmethod
+    async def timeseries(
+        self,
+        user_id: uuid.UUID,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        granularity: str,
+        group_by: str,
+    ) -> List[dict]:
+        """
+        period (first day of the day/week/month, weeks start on Monday),
+        group_key (transaction type, or category name of expenses) and
+        total_amount, ordered by period.
+        """
+
+class Repository:
+    """The storage backend the crud layer talks to."""
+
+    transactions: TransactionRepository
+    categories: CategoryRepository
+    summaries: SummaryRepository
+
+    async def close(self) -> None:
+        pass
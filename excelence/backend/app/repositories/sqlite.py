@@ -0,0 +1,385 @@
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from app.core import upstream
+from app.repositories.base import (
+    CategoryRepository,
+    KeysetPosition,
+    Repository,
+    SummaryRepository,
+    TransactionRepository,
+)
+from app.schemas import TransactionFilter
+
+# Mirrors the Postgres schema in supabase/migrations, plus the indexes the
+# queries below rely on.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    name TEXT NOT NULL,
+    emoji TEXT,
+    user_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    amount REAL NOT NULL,
+    type TEXT NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT,
+    category_id TEXT NOT NULL REFERENCES categories (id) ON DELETE RESTRICT,
+    user_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS categories_user_name_idx ON categories (user_id, name);
+-- Keyset pagination on (date, id)
+CREATE INDEX IF NOT EXISTS transactions_user_date_id_idx ON transactions (user_id, date DESC, id DESC);
+-- Covers both dashboard aggregations without touching the table
+CREATE INDEX IF NOT EXISTS transactions_user_type_category_idx ON transactions (user_id, type, category_id, amount);
+-- Category usage checks and foreign key enforcement on category deletes
+CREATE INDEX IF NOT EXISTS transactions_category_user_idx ON transactions (category_id, user_id);
+"""
+
+TABLE_COLUMNS = {
+    'transactions': ('id', 'created_at', 'amount', 'type', 'date', 'description', 'category_id', 'user_id'),
+    'categories': ('id', 'created_at', 'name', 'emoji', 'user_id'),
+}
+# Many-to-one relations that can be embedded PostgREST style, e.g. "categories(name)"
+EMBEDS = {'transactions': {'categories': 'category_id'}}
+
+_EMBED_RE = re.compile(r'^(\w+)\s*\((.*)\)$')
+
+def _split_columns(columns: str) -> list[str]:
+    parts, depth, current = [], 0, ''
+    for ch in columns:
+        if ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (ch == '(') - (ch == ')')
+        current += ch
+    parts.append(current.strip())
+    return [p for p in parts if p]
+
+def parse_columns(table: str, columns: str) -> tuple[list[str], dict[str, list[str]]]:
+    """
+    Parses a PostgREST select string into the table's columns and embedded
+    relations. Only known columns are accepted, so the result is safe to
+    interpolate into SQL.
+    """
+    fields: list[str] = []
+    embeds: dict[str, list[str]] = {}
+    for part in _split_columns(columns):
+        embed = _EMBED_RE.match(part)
+        if part == '*':
+            fields.extend(c for c in TABLE_COLUMNS[table] if c not in fields)
+        elif embed and embed.group(1) in EMBEDS.get(table, {}):
+            embeds[embed.group(1)], _ = parse_columns(embed.group(1), embed.group(2))
+        elif part in TABLE_COLUMNS[table]:
+            if part not in fields:
+                fields.append(part)
+        else:
+            raise ValueError(f"Unknown column '{part}' for {table}")
+    return fields, embeds
+
+def _value(v: Any) -> Any:
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
+
+def _checked(table: str, row: dict) -> dict:
+    unknown = set(row) - set(TABLE_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Unknown column '{sorted(unknown)[0]}' for {table}")
+    return {k: _value(v) for k, v in row.items()}
+
+class SQLiteDatabase:
+    """
+    One connection shared by all requests. Statements run in the threadpool
+    and are serialized by a lock; WAL mode keeps readers of the file from
+    other processes unblocked.
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            if path != ':memory:':
+                self.connection.execute("PRAGMA journal_mode = WAL")
+                self.connection.execute("PRAGMA synchronous = NORMAL")
+            self.connection.executescript(SCHEMA)
+
+    def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self.lock, self.connection:
+            return fn(self.connection)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any], op: str = "query") -> Any:
+        """
+        Runs `fn(connection)` in one transaction without blocking the event
+        loop, through upstream.call under `op` like session.execute does.
+        """
+        return await upstream.call(lambda: run_in_threadpool(self._run, fn), op)
+
+    async def fetch_all(self, sql: str, params: tuple = (), op: str = "select") -> list[dict]:
+        return await self.run(lambda c: [dict(r) for r in c.execute(sql, params)], op)
+
+    async def fetch_one(self, sql: str, params: tuple = (), op: str = "select") -> Optional[dict]:
+        rows = await self.fetch_all(sql, params, op)
+        return rows[0] if rows else None
+
+    async def insert(self, table: str, rows: list[dict]) -> list[dict]:
+        def insert_all(c: sqlite3.Connection) -> list[dict]:
+            created = []
+            for row in rows:
+                row = {'id': str(uuid.uuid4()), **_checked(table, row)}
+                names = ', '.join(row)
+                marks = ', '.join('?' * len(row))
+                cursor = c.execute(
+                    f"INSERT INTO {table} ({names}) VALUES ({marks}) RETURNING *",
+                    tuple(row.values()),
+                )
+                created.append(dict(cursor.fetchone()))
+            return created
+        return await self.run(insert_all, "insert")
+
+    async def update(self, table: str, changes: dict, where: str, params: tuple) -> list[dict]:
+        changes = _checked(table, changes)
+        assignments = ', '.join(f"{k} = ?" for k in changes)
+        return await self.fetch_all(
+            f"UPDATE {table} SET {assignments} WHERE {where} RETURNING *",
+            (*changes.values(), *params),
+            op="update",
+        )
+
+    async def delete(self, table: str, where: str, params: tuple) -> list[dict]:
+        return await self.fetch_all(f"DELETE FROM {table} WHERE {where} RETURNING *", params, "delete")
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+def _in(ids: list) -> str:
+    return f"id IN ({', '.join('?' * len(ids))})"
+
+class SQLiteTransactionRepository(TransactionRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def list(self, user_id, filters: Optional[TransactionFilter] = None, limit=None,
+                   after: Optional[KeysetPosition] = None, columns='*'):
+        fields, embeds = parse_columns('transactions', columns)
+        select = [f"t.{f}" for f in fields]
+        joins = []
+        for i, (name, embed_fields) in enumerate(embeds.items()):
+            select.extend(f'e{i}.{f} AS "{name}.{f}"' for f in embed_fields)
+            joins.append(f"LEFT JOIN {name} e{i} ON e{i}.id = t.{EMBEDS['transactions'][name]}")
+
+        where, params = ["t.user_id = ?"], [str(user_id)]
+        if filters is not None:
+            for column, op, value in (
+                ('date', '>=', filters.date_from),
+                ('date', '<=', filters.date_to),
+                ('type', '=', filters.type),
+                ('category_id', '=', filters.category_id),
+                ('amount', '>=', filters.min_amount),
+                ('amount', '<=', filters.max_amount),
+            ):
+                if value is not None:
+                    where.append(f"t.{column} {op} ?")
+                    params.append(_value(value))
+        if after:
+            # A row value comparison lets SQLite seek the (user_id, date, id)
+            # index; the equivalent OR form scans from the newest row.
+            where.append("(t.date, t.id) < (?, ?)")
+            params.extend(after)
+
+        sql = (
+            f"SELECT {', '.join(select) or '1'} FROM transactions t {' '.join(joins)} "
+            f"WHERE {' AND '.join(where)} ORDER BY t.date DESC, t.id DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = await self.db.fetch_all(sql, tuple(params))
+        if not embeds:
+            return rows
+        result = []
+        for row in rows:
+            out = {f: row[f] for f in fields}
+            for name, embed_fields in embeds.items():
+                embedded = {f: row[f"{name}.{f}"] for f in embed_fields}
+                out[name] = embedded if any(v is not None for v in embedded.values()) else None
+            result.append(out)
+        return result
+
+    async def get_many(self, ids, user_id):
+        return await self.db.fetch_all(f"SELECT * FROM transactions WHERE user_id = ? AND {_in(ids)}",
+                                       (str(user_id), *map(str, ids)))
+
+    async def create(self, row):
+        created = await self.db.insert('transactions', [row])
+        return created[0] if created else None
+
+    async def create_many(self, rows):
+        return await self.db.insert('transactions', rows)
+
+    async def update(self, transaction_id, user_id, changes):
+        rows = await self.db.update('transactions', changes, "id = ? AND user_id = ?",
+                                    (str(transaction_id), str(user_id)))
+        return rows[0] if rows else None
+
+    async def update_many(self, ids, user_id, changes):
+        return await self.db.update('transactions', changes, f"user_id = ? AND {_in(ids)}",
+                                    (str(user_id), *map(str, ids)))
+
+    async def delete(self, transaction_id, user_id):
+        rows = await self.db.delete('transactions', "id = ? AND user_id = ?",
+                                    (str(transaction_id), str(user_id)))
+        return rows[0] if rows else None
+
+    async def delete_many(self, ids, user_id):
+        return await self.db.delete('transactions', f"user_id = ? AND {_in(ids)}",
+                                    (str(user_id), *map(str, ids)))
+
+class SQLiteCategoryRepository(CategoryRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def list(self, user_id, columns='*'):
+        fields, _ = parse_columns('categories', columns)
+        return await self.db.fetch_all(
+            f"SELECT {', '.join(fields)} FROM categories WHERE user_id = ? ORDER BY name",
+            (str(user_id),),
+        )
+
+    async def create(self, row):
+        created = await self.db.insert('categories', [row])
+        return created[0] if created else None
+
+    async def create_many(self, rows):
+        return await self.db.insert('categories', rows)
+
+    async def update(self, category_id, user_id, changes):
+        rows = await self.db.update('categories', changes, "id = ? AND user_id = ?",
+                                    (str(category_id), str(user_id)))
+        return rows[0] if rows else None
+
+    async def delete(self, category_id, user_id):
+        rows = await self.db.delete('categories', "id = ? AND user_id = ?",
+                                    (str(category_id), str(user_id)))
+        return rows[0] if rows else None
+
+    async def usage(self, user_id, month_start):
+        month = month_start.isoformat()
+        return await self.db.fetch_all(
+            """
+            SELECT
+                category_id,
+                count(*) AS transaction_count,
+                max(date) AS last_used,
+                coalesce(sum(CASE WHEN type = 'income' AND date >= ? AND date < date(?, '+1 month')
+                             THEN amount END), 0) AS month_income,
+                coalesce(sum(CASE WHEN type = 'expense' AND date >= ? AND date < date(?, '+1 month')
+                             THEN amount END), 0) AS month_expense
+            FROM transactions
+            WHERE user_id = ?
+            GROUP BY category_id
+            """,
+            (month, month, month, month, str(user_id)),
+            op="rpc",
+        )
+
+# First day of the period containing t.date, matching Postgres date_trunc
+# (weeks start on Monday)
+PERIOD_SQL = {
+    'day': "t.date",
+    'week': "date(t.date, '-' || ((CAST(strftime('%w', t.date) AS INTEGER) + 6) % 7) || ' days')",
+    'month': "strftime('%Y-%m-01', t.date)",
+}
+
+class SQLiteSummaryRepository(SummaryRepository):
+    """Same aggregation as the get_user_financial_summary and
+    get_expenses_by_category database functions."""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def financial_summary(self, user_id):
+        return await self.db.fetch_one(
+            """
+            SELECT total_income, total_expenses, total_income - total_expenses AS net_balance
+            FROM (
+                SELECT
+                    coalesce(sum(CASE WHEN type = 'income' THEN amount ELSE 0 END), 0) AS total_income,
+                    coalesce(sum(CASE WHEN type = 'expense' THEN amount ELSE 0 END), 0) AS total_expenses
+                FROM transactions
+                WHERE user_id = ?
+            )
+            """,
+            (str(user_id),),
+            op="rpc",
+        )
+
+    async def expenses_by_category(self, user_id):
+        return await self.db.fetch_all(
+            """
+            SELECT c.name AS category_name, sum(t.amount) AS total_amount
+            FROM transactions t
+            JOIN categories c ON t.category_id = c.id
+            WHERE t.user_id = ? AND t.type = 'expense'
+            GROUP BY c.name
+            ORDER BY total_amount DESC
+            """,
+            (str(user_id),),
+            op="rpc",
+        )
+
+    async def timeseries(self, user_id, date_from, date_to, granularity, group_by):
+        if granularity not in PERIOD_SQL:
+            raise ValueError(f"Invalid granularity '{granularity}'")
+        period = PERIOD_SQL[granularity]
+        where, params = ["t.user_id = ?"], [str(user_id)]
+        if date_from is not None:
+            where.append("t.date >= ?")
+            params.append(date_from.isoformat())
+        if date_to is not None:
+            where.append("t.date <= ?")
+            params.append(date_to.isoformat())
+        if group_by == 'type':
+            group_key, joins = "t.type", ""
+        elif group_by == 'category':
+            group_key, joins = "c.name", "JOIN categories c ON t.category_id = c.id"
+            where.append("t.type = 'expense'")
+        else:
+            raise ValueError(f"Invalid group_by '{group_by}'")
+        return await self.db.fetch_all(
+            f"""
+            SELECT {period} AS period, {group_key} AS group_key, sum(t.amount) AS total_amount
+            FROM transactions t {joins}
+            WHERE {' AND '.join(where)}
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+            """,
+            tuple(params),
+            op="rpc",
+        )
+
+class SQLiteRepository(Repository):
+    def __init__(self, path: str):
+        self.db = SQLiteDatabase(path)
+        self.transactions = SQLiteTransactionRepository(self.db)
+        self.categories = SQLiteCategoryRepository(self.db)
+        self.summaries = SQLiteSummaryRepository(self.db)
+
+    async def close(self) -> None:
+        self.db.close()
@@ -0,0 +1,150 @@
+import uuid
+from typing import Optional
+
+from app.db.session import execute, get_db
+from app.repositories.base import (
+    CategoryRepository,
+    KeysetPosition,
+    Repository,
+    SummaryRepository,
+    TransactionRepository,
+)
+from app.schemas import TransactionFilter
+
+def apply_filters(query, filters: Optional[TransactionFilter]):
+    if filters is None:
+        return query
+    if filters.date_from is not None:
+        query = query.gte('date', filters.date_from.isoformat())
+    if filters.date_to is not None:
+        query = query.lte('date', filters.date_to.isoformat())
+    if filters.type is not None:
+        query = query.eq('type', filters.type)
+    if filters.category_id is not None:
+        query = query.eq('category_id', str(filters.category_id))
+    if filters.min_amount is not None:
+        query = query.gte('amount', filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.lte('amount', filters.max_amount)
+    return query
+
+def _first(response) -> Optional[dict]:
+    return response.data[0] if response.data else None
+
+class SupabaseTransactionRepository(TransactionRepository):
+    async def list(self, user_id, filters=None, limit=None, after: Optional[KeysetPosition] = None, columns='*'):
+        query = apply_filters(
+            get_db().table('transactions').select(columns).match({'user_id': str(user_id)}),
+            filters,
+        )
+        if after:
+            after_date, after_id = after
+            # The redundant date bound lets Postgres range-scan the index
+            query = query.lte('date', after_date).or_(
+                f"date.lt.{after_date},and(date.eq.{after_date},id.lt.{after_id})"
+            )
+        query = query.order('date', desc=True).order('id', desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+        return (await execute(query, op="select")).data or []
+
+    async def get_many(self, ids, user_id):
+        response = await execute(get_db().table('transactions').select('*').eq(
+            'user_id', str(user_id)
+        ).in_('id', [str(i) for i in ids]), op="select")
+        return response.data or []
+
+    async def create(self, row):
+        return _first(await execute(get_db().table('transactions').insert(row), op="insert"))
+
+    async def create_many(self, rows):
+        return (await execute(get_db().table('transactions').insert(rows), op="insert")).data or []
+
+    async def update(self, transaction_id, user_id, changes):
+        return _first(await execute(get_db().table('transactions').update(changes).match({
+            'id': str(transaction_id),
+            'user_id': str(user_id)
+        }), op="update"))
+
+    async def update_many(self, ids, user_id, changes):
+        response = await execute(get_db().table('transactions').update(changes).eq(
+            'user_id', str(user_id)
+        ).in_('id', [str(i) for i in ids]), op="update")
+        return response.data or []
+
+    async def delete(self, transaction_id, user_id):
+        return _first(await execute(get_db().table('transactions').delete().match({
+            'id': str(transaction_id),
+            'user_id': str(user_id)
+        }), op="delete"))
+
+    async def delete_many(self, ids, user_id):
+        response = await execute(get_db().table('transactions').delete().eq(
+            'user_id', str(user_id)
+        ).in_('id', [str(i) for i in ids]), op="delete")
+        return response.data or []
+
+class SupabaseCategoryRepository(CategoryRepository):
+    async def list(self, user_id, columns='*'):
+        response = await execute(
+            get_db().table('categories').select(columns).eq('user_id', str(user_id)).order('name'),
+            op="select",
+        )
+        return response.data or []
+
+    async def create(self, row):
+        return _first(await execute(get_db().table('categories').insert(row), op="insert"))
+
+    async def create_many(self, rows):
+        return (await execute(get_db().table('categories').insert(rows), op="insert")).data or []
+
+    async def update(self, category_id, user_id, changes):
+        return _first(await execute(
+            get_db().table('categories').update(changes).eq('id', str(category_id)).eq('user_id', str(user_id)),
+            op="update",
+        ))
+
+    async def delete(self, category_id, user_id):
+        return _first(await execute(
+            get_db().table('categories').delete().eq('id', str(category_id)).eq('user_id', str(user_id)),
+            op="delete",
+        ))
+
+    async def usage(self, user_id, month_start):
+        response = await execute(get_db().rpc('get_category_usage', {
+            'p_user_id': str(user_id),
+            'p_month_start': month_start.isoformat(),
+        }), op="rpc")
+        return response.data or []
+
+class SupabaseSummaryRepository(SummaryRepository):
+    """Aggregation runs in the database functions from supabase/migrations."""
+
+    async def financial_summary(self, user_id):
+        return _first(await execute(get_db().rpc(
+            'get_user_financial_summary',
+            {'p_user_id': str(user_id)}
+        ), op="rpc"))
+
+    async def expenses_by_category(self, user_id):
+        response = await execute(get_db().rpc(
+            'get_expenses_by_category',
+            {'p_user_id': str(user_id)}
+        ), op="rpc")
+        return response.data or []
+
+    async def timeseries(self, user_id, date_from, date_to, granularity, group_by):
+        response = await execute(get_db().rpc('get_transactions_timeseries', {
+            'p_user_id': str(user_id),
+            'p_from': date_from.isoformat() if date_from else None,
+            'p_to': date_to.isoformat() if date_to else None,
+            'p_granularity': granularity,
+            'p_group_by': group_by,
+        }), op="rpc")
+        return response.data or []
+
+class SupabaseRepository(Repository):
+    def __init__(self):
+        self.transactions = SupabaseTransactionRepository()
+        self.categories = SupabaseCategoryRepository()
+        self.summaries = SupabaseSummaryRepository()
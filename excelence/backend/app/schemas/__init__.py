@@ -1,21 +1,41 @@
-from .category import Category, CategoryCreate, CategoryUpdate
-from .chart import ChartDataPoint, ChartDataResponse
+from .category import Category, CategoryCreate, CategoryUpdate, CategoryWithUsage
+from .chart import ChartDataPoint, ChartDataResponse, TimeseriesResponse, TimeseriesSeries
+from .imports import ImportResult, ImportRowError
 from .summary import Summary
 from .token import Token, TokenPayload
-from .transaction import Transaction, TransactionCreate, TransactionUpdate
+from .transaction import (
+    BatchItemResult,
+    Transaction,
+    TransactionBatch,
+    TransactionBatchResult,
+    TransactionBatchUpdate,
+    TransactionCreate,
+    TransactionFilter,
+    TransactionUpdate,
+)
 from .user import User, UserCreate, UserUpdate
 
 __all__ = [
+    "BatchItemResult",
     "Category",
     "CategoryCreate",
     "CategoryUpdate",
+    "CategoryWithUsage",
     "ChartDataPoint",
     "ChartDataResponse",
+    "ImportResult",
+    "ImportRowError",
     "Summary",
+    "TimeseriesResponse",
+    "TimeseriesSeries",
     "Token",
     "TokenPayload",
     "Transaction",
+    "TransactionBatch",
+    "TransactionBatchResult",
+    "TransactionBatchUpdate",
     "TransactionCreate",
+    "TransactionFilter",
     "TransactionUpdate",
     "User",
     "UserCreate",
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+import datetime
 import uuid
 
 class CategoryBase(BaseModel):
@@ -12,8 +13,15 @@ class CategoryUpdate(CategoryBase):
     pass
 
 class Category(CategoryBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: uuid.UUID
     user_id: uuid.UUID
 
-    class Config:
-        from_attributes = True
+class CategoryWithUsage(Category):
+    """A category plus its usage, returned with `with_usage=true`."""
+
+    transaction_count: int | None = None
+    last_used: datetime.date | None = None
+    month_income: float | None = None
+    month_expense: float | None = None
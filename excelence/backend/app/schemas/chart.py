@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List
 from pydantic import BaseModel
 
@@ -8,3 +9,15 @@ class ChartDataPoint(BaseModel):
 class ChartDataResponse(BaseModel):
     status: str
     data: List[ChartDataPoint]
+
+class TimeseriesSeries(BaseModel):
+    name: str
+    # One total per entry of TimeseriesResponse.periods
+    values: List[float]
+
+class TimeseriesResponse(BaseModel):
+    granularity: str
+    group_by: str
+    # First day of each period, with no gaps
+    periods: List[date]
+    series: List[TimeseriesSeries]
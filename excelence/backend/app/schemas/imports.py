@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class ImportRowError(BaseModel):
+    row: int
+    sheet: str | None = None
+    error: str
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    created_categories: list[str] = []
+    errors: list[ImportRowError] = []
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing import List
+import datetime
 import uuid
 from datetime import date
 
 class TransactionBase(BaseModel):
     amount: float
-    type: str
+    type: str  # "income" or "expense"
     date: date
     description: str | None = None
     category_id: uuid.UUID
@@ -12,12 +14,43 @@ class TransactionBase(BaseModel):
 class TransactionCreate(TransactionBase):
     pass
 
-class TransactionUpdate(TransactionBase):
-    pass
+class TransactionUpdate(BaseModel):
+    """Partial update: only the fields that are set are changed."""
+    amount: float | None = None
+    type: str | None = None
+    date: datetime.date | None = None
+    description: str | None = None
+    category_id: uuid.UUID | None = None
 
 class Transaction(TransactionBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: uuid.UUID
     user_id: uuid.UUID
 
-    class Config:
-        from_attributes = True
+class TransactionFilter(BaseModel):
+    """Optional list filters, applied by the database rather than in Python."""
+    date_from: date | None = None
+    date_to: date | None = None
+    type: str | None = None
+    category_id: uuid.UUID | None = None
+    min_amount: float | None = None
+    max_amount: float | None = None
+
+class TransactionBatchUpdate(TransactionUpdate):
+    id: uuid.UUID
+
+class TransactionBatch(BaseModel):
+    create: List[TransactionCreate] = []
+    update: List[TransactionBatchUpdate] = []
+    delete: List[uuid.UUID] = []
+
+class BatchItemResult(BaseModel):
+    op: str  # "create", "update" or "delete"
+    index: int  # position of the item in its request list
+    id: uuid.UUID | None = None
+    status: int
+    error: str | None = None
+
+class TransactionBatchResult(BaseModel):
+    results: List[BatchItemResult]
@@ -0,0 +1,125 @@
+"""
+Deterministic local stand-in for Supabase used by the benchmarks: the
+SQLite storage backend seeded with generated data, plus fakes for the
+Supabase Auth calls. Every upstream call can be
+delayed by a fixed latency to model the network round trip.
+"""
+import asyncio
+import functools
+import random
+import sqlite3
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.repositories.base import Repository
+from app.repositories.sqlite import SQLiteRepository
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+USER_ID = uuid.UUID(int=1)
+CATEGORIES = 25
+DESCRIPTIONS = [None, "Groceries", "Monthly rent payment", "Coffee", "Salary", "Train ticket"]
+
+def seed_database(rows: int, seed: int = 0) -> Path:
+    """
+    Creates (once) a SQLite database with `rows` transactions for USER_ID
+    spread over ~10 years, and returns its path. The same rows and seed
+    always produce the same data.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f"standin-{rows}-{seed}.db"
+    if path.exists():
+        return path
+
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    SQLiteRepository(str(tmp)).db.close()  # creates the schema and indexes
+    rng = random.Random(seed)
+    connection = sqlite3.connect(tmp)
+    with connection:
+        categories = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(CATEGORIES)]
+        connection.executemany(
+            "INSERT INTO categories (id, name, user_id) VALUES (?, ?, ?)",
+            [(c, f"Category {i}", str(USER_ID)) for i, c in enumerate(categories)],
+        )
+        start = date(2016, 1, 1)
+        batch = []
+        for i in range(rows):
+            kind = "income" if rng.random() < 0.1 else "expense"
+            batch.append((
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                round(rng.uniform(1, 3000 if kind == "income" else 300), 2),
+                kind,
+                (start + timedelta(days=rng.randrange(3650))).isoformat(),
+                rng.choice(DESCRIPTIONS),
+                rng.choice(categories),
+                str(USER_ID),
+            ))
+            if len(batch) == 50_000 or i == rows - 1:
+                connection.executemany(
+                    "INSERT INTO transactions (id, amount, type, date, description, category_id, user_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+                batch = []
+    connection.execute("ANALYZE")
+    connection.close()
+    tmp.rename(path)
+    return path
+
+class _Delayed:
+    """Proxies a repository, awaiting `latency` seconds before every call."""
+
+    def __init__(self, target, latency: float):
+        self._target = target
+        self._latency = latency
+
+    def __getattr__(self, name):
+        method = getattr(self._target, name)
+
+        @functools.wraps(method)
+        async def delayed(*args, **kwargs):
+            if self._latency:
+                await asyncio.sleep(self._latency)
+            return await method(*args, **kwargs)
+        return delayed
+
+class LatencyRepository(Repository):
+    def __init__(self, repository: Repository, latency: float):
+        self.repository = repository
+        self.transactions = _Delayed(repository.transactions, latency)
+        self.categories = _Delayed(repository.categories, latency)
+        self.summaries = _Delayed(repository.summaries, latency)
+
+    async def close(self) -> None:
+        await self.repository.close()
+
+class FakeAuth:
+    """The Supabase Auth calls made by the API, answered locally."""
+
+    def __init__(self, latency: float, access_token: str):
+        self.latency = latency
+        self.access_token = access_token
+        self.user = SimpleNamespace(id=str(USER_ID), email="bench@example.com", identities=[{}])
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)  # the real client is synchronous too
+
+    def sign_up(self, credentials):
+        self._wait()
+        return SimpleNamespace(user=self.user, session=None)
+
+    def sign_in_with_password(self, credentials):
+        self._wait()
+        return SimpleNamespace(user=self.user, session=SimpleNamespace(access_token=self.access_token))
+
+    def resend(self, credentials):
+        self._wait()
+        return SimpleNamespace(user=None, session=None)
+
+    def get_user(self, jwt=None):
+        self._wait()
+        return SimpleNamespace(user=self.user)
@@ -1,13 +1,100 @@
-from fastapi import FastAPI
+import time
+
+_import_started = time.perf_counter()
+
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, items, categories, transactions, dashboard, export
+from app.api.v1.endpoints import auth, categories, transactions, dashboard, export, imports
+from app.core.compression import CompressionMiddleware
+from app.core.concurrency import ConcurrencyLimitMiddleware
+from app.core import metrics
+from app.core.loop_monitor import LoopMonitor, LoopMonitorMiddleware
 from app.core.config import settings
+from app.core.responses import default_response_class
+from app.core.timing import ServerTimingMiddleware
+from app.db import session
+from app.repositories import close_repository
+
+logger = logging.getLogger(__name__)
+
+# Mounted under /api/v1/<name>; each name also gets its own concurrency limit
+API_ROUTERS = {
+    "auth": auth.router,
+    "categories": categories.router,
+    "transactions": transactions.router,
+    "dashboard": dashboard.router,
+    "export": export.router,
+    "import": imports.router,
+}
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    # Supabase clients (the shared async one with SUPABASE_ASYNC=true) are
+    # created here rather than at import, and not at all when only the
+    # auth endpoints would use them
+    await session.init_clients()
+    monitor = None
+    if settings.LOOP_STALL_THRESHOLD_MS > 0:
+        monitor = LoopMonitor(settings.LOOP_STALL_THRESHOLD_MS / 1000)
+        monitor.start()
+    ready = time.perf_counter()
+    app.state.startup_timings = {
+        "imports_ms": round((_import_finished - _import_started) * 1000, 1),
+        "clients_ms": round((ready - started) * 1000, 1),
+        "ready_ms": round((ready - _import_started) * 1000, 1),
+    }
+    # Startup report; ready_ms counts from the start of this module's import
+    logger.info(
+        "Ready in %(ready_ms).0f ms (imports %(imports_ms).0f ms, clients %(clients_ms).0f ms)",
+        app.state.startup_timings,
+    )
+    yield
+    if monitor is not None:
+        monitor.stop()
+    await session.close_async_client()
+    await close_repository()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=default_response_class())
 
 # Log CORS configuration on startup
 print(f"🔧 CORS Origins configured: {settings.cors_origins_list}")
 
+# Innermost: reads upstream latency from the request's timings. Inside
+# CORS, so rejections still carry CORS headers for the browser.
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        prefix=settings.API_V1_STR,
+        groups=API_ROUTERS,
+        initial=settings.CONCURRENCY_LIMIT_INITIAL,
+        min_limit=settings.CONCURRENCY_LIMIT_MIN,
+        max_limit=settings.CONCURRENCY_LIMIT_MAX,
+        budgets=settings.concurrency_budgets,
+    )
+
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Lets the loop monitor name the route of a request blocking the loop
+if settings.LOOP_STALL_THRESHOLD_MS > 0:
+    app.add_middleware(LoopMonitorMiddleware)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -15,17 +102,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "Retry-After", "Idempotent-Replayed"],
 )
 
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
-app.include_router(items.router, prefix="/api/v1/items", tags=["items"])
-app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
-app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
-app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
-app.include_router(export.router, prefix="/api/v1/export", tags=["export"])
+# Outermost, so latency includes compression and CORS handling
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+for name, router in API_ROUTERS.items():
+    app.include_router(router, prefix=f"{settings.API_V1_STR}/{name}", tags=[name])
 
 
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def read_metrics(authorization: Optional[str] = Header(None)):
+        # Only for scrapers sending METRICS_TOKEN as a bearer token; a 404
+        # otherwise, so the endpoint isn't advertised
+        token = settings.METRICS_TOKEN
+        if not token or not secrets.compare_digest((authorization or "").encode(), f"Bearer {token}".encode()):
+            raise HTTPException(status_code=404, detail="Not Found")
+        return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+_import_finished = time.perf_counter()
@@ -0,0 +1,3 @@
+-- Support keyset pagination of a user's transactions on (date, id)
+create index if not exists transactions_user_date_id_idx
+  on public.transactions (user_id, date desc, id desc);
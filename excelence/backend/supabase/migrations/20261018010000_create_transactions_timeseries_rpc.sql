@@ -0,0 +1,58 @@
+-- Totals per period (day, week or month) and per transaction type or
+-- expense category, for the dashboard trend charts
+create or replace function get_transactions_timeseries(
+  p_user_id uuid,
+  p_from date,
+  p_to date,
+  p_granularity text,
+  p_group_by text
+)
+returns table (period date, group_key varchar, total_amount numeric)
+language plpgsql
+security definer
+as $$
+begin
+  if p_granularity not in ('day', 'week', 'month') then
+    raise exception 'Invalid granularity %', p_granularity;
+  end if;
+
+  if p_group_by = 'type' then
+    return query
+    select
+      date_trunc(p_granularity, t.date)::date as period,
+      t.type as group_key,
+      sum(t.amount) as total_amount
+    from
+      transactions t
+    where
+      t.user_id = p_user_id
+      and (p_from is null or t.date >= p_from)
+      and (p_to is null or t.date <= p_to)
+    group by
+      1, 2
+    order by
+      1, 2;
+  elsif p_group_by = 'category' then
+    return query
+    select
+      date_trunc(p_granularity, t.date)::date as period,
+      c.name as group_key,
+      sum(t.amount) as total_amount
+    from
+      transactions t
+    join
+      categories c on t.category_id = c.id
+    where
+      t.user_id = p_user_id
+      and t.type = 'expense'
+      and (p_from is null or t.date >= p_from)
+      and (p_to is null or t.date <= p_to)
+    group by
+      1, 2
+    order by
+      1, 2;
+  else
+    raise exception 'Invalid group_by %', p_group_by;
+  end if;
+end;
+$$;
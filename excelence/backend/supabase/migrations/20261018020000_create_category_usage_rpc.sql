@@ -0,0 +1,29 @@
+-- Usage of each of a user's categories in one grouped scan: how many
+-- transactions use it, when it was last used and its total in the month
+-- starting at p_month_start. Categories without transactions are omitted.
+create or replace function get_category_usage(p_user_id uuid, p_month_start date)
+returns table (category_id uuid, transaction_count bigint, last_used date, month_total numeric)
+language plpgsql
+security definer
+as $$
+begin
+  return query
+  select
+    t.category_id,
+    count(*) as transaction_count,
+    max(t.date) as last_used,
+    coalesce(
+      sum(t.amount) filter (
+        where t.date >= p_month_start
+          and t.date < (p_month_start + interval '1 month')::date
+      ),
+      0
+    ) as month_total
+  from
+    transactions t
+  where
+    t.user_id = p_user_id
+  group by
+    t.category_id;
+end;
+$$;
@@ -0,0 +1,47 @@
+-- Split get_category_usage's month_total by transaction type: amounts are
+-- stored unsigned, so summing them mixed income and expenses
+-- Drop the old function first, since the return type changes
+drop function if exists get_category_usage(uuid, date);
+
+-- Recreate with month_income and month_expense
+create or replace function get_category_usage(p_user_id uuid, p_month_start date)
+returns table (
+  category_id uuid,
+  transaction_count bigint,
+  last_used date,
+  month_income numeric,
+  month_expense numeric
+)
+language plpgsql
+security definer
+as $$
+begin
+  return query
+  select
+    t.category_id,
+    count(*) as transaction_count,
+    max(t.date) as last_used,
+    coalesce(
+      sum(t.amount) filter (
+        where t.type = 'income'
+          and t.date >= p_month_start
+          and t.date < (p_month_start + interval '1 month')::date
+      ),
+      0
+    ) as month_income,
+    coalesce(
+      sum(t.amount) filter (
+        where t.type = 'expense'
+          and t.date >= p_month_start
+          and t.date < (p_month_start + interval '1 month')::date
+      ),
+      0
+    ) as month_expense
+  from
+    transactions t
+  where
+    t.user_id = p_user_id
+  group by
+    t.category_id;
+end;
+$$;
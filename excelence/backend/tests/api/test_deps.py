@@ -0,0 +1,73 @@
+import time
+import uuid
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.api import deps
+from app.core.config import settings
+
+
+def make_token(user_id, expires_in=3600, **claims):
+    payload = {
+        "sub": str(user_id),
+        "email": "test@example.com",
+        "aud": settings.JWT_AUDIENCE,
+        "exp": int(time.time()) + expires_in,
+        **claims,
+    }
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture
+def local_jwt(mocker):
+    mocker.patch.object(settings, "AUTH_LOCAL_JWT", True)
+    deps.token_cache.clear()
+    yield
+    deps.token_cache.clear()
+
+
+@pytest.fixture
+def mock_summary_rpc():
+    with patch('app.db.session.supabase.rpc') as mock_rpc:
+        mock_execute = MagicMock()
+        type(mock_execute).data = PropertyMock(return_value=[])
+        mock_rpc.return_value.execute.return_value = mock_execute
+        yield mock_rpc
+
+
+def test_local_jwt_skips_remote_lookup(client: TestClient, local_jwt, mock_supabase_auth_user, mock_summary_rpc, USER_ID):
+    token = make_token(USER_ID)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/v1/dashboard/summary", headers=headers).status_code == 200
+    assert client.get("/api/v1/dashboard/summary", headers=headers).status_code == 200
+
+    mock_supabase_auth_user.assert_not_called()
+    stats = deps.auth_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_local_jwt_falls_back_to_remote(client: TestClient, local_jwt, mock_supabase_auth_user, mock_summary_rpc):
+    token = jwt.encode(
+        {"sub": str(uuid.uuid4()), "aud": settings.JWT_AUDIENCE, "exp": int(time.time()) + 60},
+        "some-other-secret",
+        algorithm=settings.ALGORITHM,
+    )
+
+    response = client.get("/api/v1/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    mock_supabase_auth_user.assert_called_once_with(token)
+
+
+def test_local_jwt_rejects_expired_token(client: TestClient, local_jwt, mock_supabase_auth_user, USER_ID):
+    token = make_token(USER_ID, expires_in=-10)
+
+    response = client.get("/api/v1/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 403
+    mock_supabase_auth_user.assert_not_called()
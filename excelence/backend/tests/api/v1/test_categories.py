@@ -50,38 +50,71 @@ def test_update_category(authenticated_client: TestClient, mock_supabase_db, USE
     data = response.json()
     assert data["name"] == "Food"
 
-def test_delete_category_success(authenticated_client: TestClient, mock_supabase_db, USER_ID):
-    # Mock transaction check (no transactions found)
-    mock_transaction_check = MagicMock()
-    type(mock_transaction_check).count = PropertyMock(return_value=0)
+def test_delete_category_success(authenticated_client: TestClient, mock_supabase_db, mocker, USER_ID):
+    category_id = uuid.uuid4()
+    # Mock the usage check (only another category is in use)
+    mock_usage = MagicMock()
+    type(mock_usage).data = PropertyMock(return_value=[
+        {"category_id": str(uuid.uuid4()), "transaction_count": 4, "last_used": "2026-01-01", "month_income": 0, "month_expense": 0}
+    ])
+    mocker.patch("app.db.session.supabase.rpc").return_value.execute.return_value = mock_usage
     
     # Mock delete call
     mock_delete_execute = MagicMock()
-    type(mock_delete_execute).data = PropertyMock(return_value=[{"id": 1}])
-
-    # Configure the mock_supabase_db to handle both calls
-    mock_supabase_db.return_value.select.return_value.eq.return_value.eq.return_value.execute.return_value = mock_transaction_check
+    type(mock_delete_execute).data = PropertyMock(return_value=[{"id": str(category_id)}])
     mock_supabase_db.return_value.delete.return_value.eq.return_value.eq.return_value.execute.return_value = mock_delete_execute
     
     response = authenticated_client.delete(
-        "/api/v1/categories/1",
+        f"/api/v1/categories/{category_id}",
     )
     
     assert response.status_code == 200
     assert response.json() == {"detail": "Category deleted successfully"}
 
-def test_delete_category_in_use(authenticated_client: TestClient, mock_supabase_db, USER_ID):
-    # Mock transaction check (1 transaction found)
-    mock_transaction_check = MagicMock()
-    type(mock_transaction_check).count = PropertyMock(return_value=1)
-    mock_supabase_db.return_value.select.return_value.eq.return_value.eq.return_value.execute.return_value = mock_transaction_check
+def test_delete_category_in_use(authenticated_client: TestClient, mock_supabase_db, mocker, USER_ID):
+    category_id = uuid.uuid4()
+    # Mock the usage check (1 transaction found)
+    mock_usage = MagicMock()
+    type(mock_usage).data = PropertyMock(return_value=[
+        {"category_id": str(category_id), "transaction_count": 1, "last_used": "2026-01-01", "month_income": 0, "month_expense": 0}
+    ])
+    mocker.patch("app.db.session.supabase.rpc").return_value.execute.return_value = mock_usage
 
     response = authenticated_client.delete(
-        "/api/v1/categories/1",
+        f"/api/v1/categories/{category_id}",
     )
 
     assert response.status_code == 400
     assert "Cannot delete category" in response.json()["detail"]
+    mock_supabase_db.return_value.delete.assert_not_called()
+
+def test_read_categories_with_usage(authenticated_client: TestClient, mock_supabase_db, mocker, USER_ID):
+    used, unused = uuid.uuid4(), uuid.uuid4()
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[
+        {"id": str(used), "name": "Groceries"},
+        {"id": str(unused), "name": "Travel"},
+    ])
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = mock_execute
+    mock_usage = MagicMock()
+    type(mock_usage).data = PropertyMock(return_value=[
+        {"category_id": str(used), "transaction_count": 12, "last_used": "2026-10-17", "month_income": 0, "month_expense": 84.5}
+    ])
+    mock_rpc = mocker.patch("app.db.session.supabase.rpc")
+    mock_rpc.return_value.execute.return_value = mock_usage
+
+    response = authenticated_client.get(
+        "/api/v1/categories/", params={"with_usage": True, "fields": "name"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"name": "Groceries", "transaction_count": 12, "last_used": "2026-10-17", "month_income": 0, "month_expense": 84.5},
+        {"name": "Travel", "transaction_count": 0, "last_used": None, "month_income": 0, "month_expense": 0},
+    ]
+    # The id is selected for the join even though it is not returned
+    mock_supabase_db.return_value.select.assert_called_once_with("id, name")
+    assert mock_rpc.call_count == 1
 
 def test_update_category_not_found(authenticated_client: TestClient, mock_supabase_db, USER_ID):
     mock_execute = MagicMock()
@@ -123,4 +123,137 @@ def test_get_financial_summary_no_transactions(
         mock_rpc.assert_called_once_with(
             'get_user_financial_summary',
             {'p_user_id': str(USER_ID)}
-        )
\ No newline at end of file
+        )
+
+def test_get_financial_summary_async_client(
+    client: TestClient,
+    mocker,
+    USER_ID,
+) -> None:
+    """
+    With the shared async client active, auth and the RPC are awaited on it
+    instead of going through the sync client.
+    """
+    from unittest.mock import AsyncMock
+    from app.db import session
+
+    async_client = MagicMock()
+    async_client.auth.get_user = AsyncMock(
+        return_value=MagicMock(user=MagicMock(id=USER_ID, email="test@example.com"))
+    )
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[{
+        "total_income": 10.0,
+        "total_expenses": 4.0,
+        "net_balance": 6.0
+    }])
+    async_client.rpc.return_value.execute = AsyncMock(return_value=mock_execute)
+    mocker.patch.object(session, "async_supabase", async_client)
+    sync_rpc = mocker.patch('app.db.session.supabase.rpc')
+
+    response = client.get(
+        f"{settings.API_V1_STR}/dashboard/summary",
+        headers={"Authorization": "Bearer fake-token"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["net_balance"] == 6.0
+    async_client.auth.get_user.assert_awaited_once_with("fake-token")
+    async_client.rpc.assert_called_once_with(
+        'get_user_financial_summary',
+        {'p_user_id': str(USER_ID)}
+    )
+    sync_rpc.assert_not_called()
+
+
+def test_summary_is_cached_until_a_write(
+    authenticated_client: TestClient,
+    mock_supabase_db,
+    USER_ID,
+) -> None:
+    """
+    Repeated summary requests are served from the cache; a transaction write
+    invalidates it.
+    """
+    mock_summary_data = {"total_income": 10.0, "total_expenses": 4.0, "net_balance": 6.0}
+
+    with patch('app.db.session.supabase.rpc') as mock_rpc:
+        mock_execute = MagicMock()
+        type(mock_execute).data = PropertyMock(return_value=[mock_summary_data])
+        mock_rpc.return_value.execute.return_value = mock_execute
+
+        for _ in range(3):
+            response = authenticated_client.get(f"{settings.API_V1_STR}/dashboard/summary")
+            assert response.status_code == 200
+            assert response.json()["net_balance"] == 6.0
+        assert mock_rpc.call_count == 1
+
+        mock_delete = MagicMock()
+        type(mock_delete).data = PropertyMock(return_value=[{"id": "1"}])
+        mock_supabase_db.return_value.delete.return_value.match.return_value.execute.return_value = mock_delete
+        response = authenticated_client.delete(
+            f"{settings.API_V1_STR}/transactions/00000000-0000-0000-0000-000000000001"
+        )
+        assert response.status_code == 200
+
+        response = authenticated_client.get(f"{settings.API_V1_STR}/dashboard/summary")
+        assert response.status_code == 200
+        assert mock_rpc.call_count == 2
+
+
+def test_get_timeseries_integration(
+    authenticated_client: TestClient,
+    USER_ID,
+) -> None:
+    """
+    The timeseries endpoint pivots the RPC rows into a gap-free period axis
+    with one value list per series.
+    """
+    mock_rows = [
+        {"period": "2026-01-01", "group_key": "expense", "total_amount": 40},
+        {"period": "2026-01-01", "group_key": "income", "total_amount": 1000},
+        {"period": "2026-03-01", "group_key": "expense", "total_amount": 60},
+    ]
+
+    with patch('app.db.session.supabase.rpc') as mock_rpc:
+        mock_execute = MagicMock()
+        type(mock_execute).data = PropertyMock(return_value=mock_rows)
+        mock_rpc.return_value.execute.return_value = mock_execute
+
+        response = authenticated_client.get(
+            f"{settings.API_V1_STR}/dashboard/timeseries",
+            params={"from": "2026-01-15", "to": "2026-04-02", "granularity": "month", "group_by": "type"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "granularity": "month",
+            "group_by": "type",
+            "periods": ["2026-01-01", "2026-02-01", "2026-03-01", "2026-04-01"],
+            "series": [
+                {"name": "income", "values": [1000.0, 0.0, 0.0, 0.0]},
+                {"name": "expense", "values": [40.0, 0.0, 60.0, 0.0]},
+            ],
+        }
+        mock_rpc.assert_called_once_with('get_transactions_timeseries', {
+            'p_user_id': str(USER_ID),
+            'p_from': '2026-01-15',
+            'p_to': '2026-04-02',
+            'p_granularity': 'month',
+            'p_group_by': 'type',
+        })
+
+        response = authenticated_client.get(
+            f"{settings.API_V1_STR}/dashboard/timeseries",
+            params={"from": "2026-05-01", "to": "2026-04-01"},
+        )
+        assert response.status_code == 400
+
+        # Too many periods is rejected without running the aggregation
+        response = authenticated_client.get(
+            f"{settings.API_V1_STR}/dashboard/timeseries",
+            params={"from": "2000-01-01", "to": "2026-01-01", "granularity": "day"},
+        )
+        assert response.status_code == 400
+        assert "periods" in response.json()["detail"]
+        assert mock_rpc.call_count == 1
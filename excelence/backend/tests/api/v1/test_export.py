@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, PropertyMock
+import io
 import uuid
 from datetime import date
 
@@ -34,9 +35,9 @@ def test_export_csv(authenticated_client: TestClient, mock_supabase_db, USER_ID)
         }
     ])
     
-    # Mock the chain: table().select().eq().order().execute()
-    # Note: The order of calls must match the implementation: table -> select -> eq -> order -> execute
-    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = mock_execute
+    # Mock the chain: table().select().match().order().order().limit().execute()
+    # Note: The order of calls must match the implementation: table -> select -> match -> order -> order -> limit -> execute
+    mock_supabase_db.return_value.select.return_value.match.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_execute
 
     response = authenticated_client.get("/api/v1/export/csv")
     
@@ -53,7 +54,7 @@ def test_export_csv_empty(authenticated_client: TestClient, mock_supabase_db, US
     mock_execute = MagicMock()
     type(mock_execute).data = PropertyMock(return_value=[])
     
-    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = mock_execute
+    mock_supabase_db.return_value.select.return_value.match.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_execute
 
     response = authenticated_client.get("/api/v1/export/csv")
     
@@ -65,6 +66,63 @@ def test_export_csv_empty(authenticated_client: TestClient, mock_supabase_db, US
     assert len(lines) == 1
     assert lines[0] == "Date,Description,Category,Amount,Type"
 
+def test_export_csv_pages_through_history(authenticated_client: TestClient, mock_supabase_db, mocker, USER_ID):
+    mocker.patch("app.core.config.settings.EXPORT_PAGE_SIZE", 2)
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "amount": float(i),
+            "type": "expense",
+            "date": f"2025-12-{10 - i:02d}",
+            "description": f"Item {i}",
+            "categories": {"name": "Food"}
+        }
+        for i in range(5)
+    ]
+    pages = []
+    for start in (0, 2, 4):
+        page = MagicMock()
+        type(page).data = PropertyMock(return_value=rows[start:start + 3])
+        pages.append(page)
+    query = mock_supabase_db.return_value.select.return_value.match.return_value
+    query.lte.return_value = query
+    query.or_.return_value = query
+    query.order.return_value = query
+    query.limit.return_value.execute.side_effect = pages
+
+    response = authenticated_client.get("/api/v1/export/csv", params={"gzip": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    lines = response.text.strip().split('\n')
+    assert len(lines) == 6
+    assert lines[-1].startswith("2025-12-06,Item 4,Food,4.0")
+    assert query.limit.return_value.execute.call_count == 3
+
+def test_export_xlsx(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    from openpyxl import load_workbook
+
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[
+        {"id": str(uuid.uuid4()), "amount": 1000.0, "type": "income", "date": "2025-01-05",
+         "description": "Salary", "categories": {"name": "Work"}},
+        {"id": str(uuid.uuid4()), "amount": 50.0, "type": "expense", "date": "2024-12-30",
+         "description": "Groceries", "categories": {"name": "Food"}},
+    ])
+    mock_supabase_db.return_value.select.return_value.match.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_execute
+
+    response = authenticated_client.get("/api/v1/export/xlsx")
+
+    assert response.status_code == 200
+    assert "attachment; filename=export.xlsx" in response.headers["content-disposition"]
+    workbook = load_workbook(io.BytesIO(response.content))
+    assert workbook.sheetnames == ["Summary", "2025", "2024"]
+    assert workbook["2024"]["A2"].value.date() == date(2024, 12, 30)
+    assert workbook["2024"]["D2"].value == 50.0
+    summary = list(workbook["Summary"].values)
+    assert summary[1] == (2025, 1000.0, 0.0, 1000.0, 1)
+    assert summary[-1] == ("Total", 1000.0, 50.0, 950.0, 2)
+
 def test_export_csv_unauthenticated(client: TestClient):
     response = client.get("/api/v1/export/csv")
     # Assuming global auth middleware or dependency handles 401
@@ -0,0 +1,158 @@
+import io
+import uuid
+from datetime import date, datetime
+from unittest.mock import MagicMock, PropertyMock
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+
+def fake_insert(inserted):
+    def insert(rows):
+        inserted.append(rows)
+        query = MagicMock()
+        type(query.execute.return_value).data = PropertyMock(return_value=[
+            {"id": str(uuid.uuid4()), **row} for row in rows
+        ])
+        return query
+    return insert
+
+
+def test_import_csv_in_batches(authenticated_client: TestClient, mock_supabase_db, mocker, USER_ID):
+    mocker.patch("app.core.config.settings.IMPORT_BATCH_SIZE", 2)
+    food_id = str(uuid.uuid4())
+    existing = MagicMock()
+    type(existing).data = PropertyMock(return_value=[{"id": food_id, "name": "Food"}])
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = existing
+    inserted = []
+    mock_supabase_db.return_value.insert.side_effect = fake_insert(inserted)
+
+    csv_file = (
+        "Date,Description,Category,Amount,Type\n"
+        "2025-01-01,Groceries,food,50.0,expense\n"
+        "not-a-date,Broken,Food,1.0,expense\n"
+        "2025-01-02,Salary,Work,1000,income\n"
+        "2025-01-03,Bus,Transport,-2.5,\n"
+    )
+    response = authenticated_client.post(
+        "/api/v1/import/",
+        files={"file": ("statement.csv", io.BytesIO(csv_file.encode()), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 3
+    assert data["failed"] == 1
+    assert data["errors"][0]["row"] == 3
+    assert data["created_categories"] == ["Work", "Transport"]
+
+    transaction_batches = [rows for rows in inserted if "amount" in rows[0]]
+    assert [len(rows) for rows in transaction_batches] == [1, 2]
+    assert transaction_batches[0][0]["category_id"] == food_id
+    bus = transaction_batches[1][1]
+    assert bus["type"] == "expense"
+    assert bus["amount"] == 2.5
+    assert bus["user_id"] == str(USER_ID)
+
+
+def test_import_csv_missing_columns(authenticated_client: TestClient, mock_supabase_db):
+    response = authenticated_client.post(
+        "/api/v1/import/",
+        files={"file": ("statement.csv", io.BytesIO(b"Foo,Bar\n1,2\n"), "text/csv")},
+    )
+
+    assert response.status_code == 400
+    assert "Date and Amount" in response.json()["detail"]
+
+
+def test_import_xlsx(authenticated_client: TestClient, mock_supabase_db):
+    food_id = str(uuid.uuid4())
+    existing = MagicMock()
+    type(existing).data = PropertyMock(return_value=[{"id": food_id, "name": "Food"}])
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = existing
+    inserted = []
+    mock_supabase_db.return_value.insert.side_effect = fake_insert(inserted)
+
+    workbook = Workbook()
+    workbook.active.title = "Summary"
+    workbook.active.append(["Total", 42])
+    sheet = workbook.create_sheet("Transactions")
+    sheet.append(["Date", "Description", "Category", "Amount", "Type"])
+    sheet.append([datetime(2025, 1, 1), "Groceries", "Food", 50.0, "expense"])
+    sheet.append([date(2025, 1, 2), None, "Food", -7, None])
+    for amount in ("nan", "inf", "1e309"):
+        sheet.append(["2025-01-03", "Broken", "Food", amount, "expense"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    response = authenticated_client.post(
+        "/api/v1/import/",
+        files={"file": ("statement.xlsx", buffer.getvalue(), "application/octet-stream")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert [(e["sheet"], e["row"]) for e in data["errors"]] == [("Transactions", 4), ("Transactions", 5), ("Transactions", 6)]
+    rows = [row for batch in inserted for row in batch]
+    assert [(r["date"], r["amount"], r["type"], r["category_id"]) for r in rows] == [
+        ("2025-01-01", 50.0, "expense", food_id),
+        ("2025-01-02", 7.0, "expense", food_id),
+    ]
+
+
+def test_import_reports_failures_after_the_first_batch(authenticated_client: TestClient, mock_supabase_db, mocker):
+    mocker.patch("app.core.config.settings.IMPORT_BATCH_SIZE", 100)
+    food_id = str(uuid.uuid4())
+    existing = MagicMock()
+    type(existing).data = PropertyMock(return_value=[{"id": food_id, "name": "Food"}])
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = existing
+    inserted = []
+    mock_supabase_db.return_value.insert.side_effect = fake_insert(inserted)
+
+    # Bytes that are not UTF-8 after several batches' worth of rows
+    csv_file = b"Date,Description,Category,Amount\n" + b"2025-01-01,Groceries,Food,-50.0\n" * 600 + b"2025-01-02,\xff\xfe,Food,-1\n"
+    response = authenticated_client.post(
+        "/api/v1/import/",
+        files={"file": ("statement.csv", io.BytesIO(csv_file), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] > 0
+    assert data["failed"] == 1
+    # Every row before the one reading stopped at was imported
+    assert data["imported"] == data["errors"][0]["row"] - 2
+    assert "could not be read" in data["errors"][0]["error"]
+    assert sum(len(rows) for rows in inserted) == data["imported"]
+
+
+def test_import_reports_category_failures_per_row(authenticated_client: TestClient, mock_supabase_db, mocker):
+    mocker.patch("app.core.config.settings.IMPORT_BATCH_SIZE", 1)
+    existing = MagicMock()
+    type(existing).data = PropertyMock(return_value=[{"id": str(uuid.uuid4()), "name": "Food"}])
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = existing
+    inserted = []
+    insert = fake_insert(inserted)
+
+    def insert_without_categories(rows):
+        if "name" in rows[0]:
+            raise Exception("Category insert failed")
+        return insert(rows)
+    mock_supabase_db.return_value.insert.side_effect = insert_without_categories
+
+    csv_file = (
+        "Date,Category,Amount\n"
+        "2025-01-01,Food,-50.0\n"
+        "2025-01-02,Travel,-20.0\n"
+        "2025-01-03,Food,-5.0\n"
+    )
+    response = authenticated_client.post(
+        "/api/v1/import/",
+        files={"file": ("statement.csv", io.BytesIO(csv_file.encode()), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert [(e["row"], e["error"]) for e in data["errors"]] == [(3, "Category insert failed")]
@@ -40,3 +40,189 @@ def test_create_transaction(authenticated_client: TestClient, mock_supabase_db,
     assert data["user_id"] == str(USER_ID)
     assert data["category_id"] == str(category_id)
     assert data["id"] == str(transaction_id)
+
+def test_list_transactions_paginated(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "amount": amount,
+            "type": "expense",
+            "date": "2025-12-0%d" % day,
+            "description": None,
+            "user_id": str(USER_ID),
+            "category_id": str(uuid.uuid4())
+        }
+        for day, amount in ((3, 30.0), (2, 20.0), (1, 10.0))
+    ]
+    query = mock_supabase_db.return_value.select.return_value.match.return_value
+    query.gte.return_value = query
+    query.lte.return_value = query
+    query.eq.return_value = query
+    query.or_.return_value = query
+    query.order.return_value = query
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=rows)
+    query.limit.return_value.execute.return_value = mock_execute
+
+    response = authenticated_client.get(
+        "/api/v1/transactions/",
+        params={"limit": 2, "type": "expense", "date_from": "2025-12-01"},
+    )
+
+    assert response.status_code == 200
+    assert [t["amount"] for t in response.json()] == [30.0, 20.0]
+    query.limit.assert_called_once_with(3)
+    query.eq.assert_called_once_with('type', 'expense')
+    query.gte.assert_called_once_with('date', '2025-12-01')
+
+    cursor = response.headers["X-Next-Cursor"]
+    authenticated_client.get("/api/v1/transactions/", params={"limit": 2, "cursor": cursor})
+    query.lte.assert_called_once_with('date', '2025-12-02')
+    query.or_.assert_called_once_with(
+        f"date.lt.2025-12-02,and(date.eq.2025-12-02,id.lt.{rows[1]['id']})"
+    )
+
+def test_list_transactions_invalid_cursor(authenticated_client: TestClient, mock_supabase_db):
+    response = authenticated_client.get("/api/v1/transactions/", params={"limit": 2, "cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+def test_batch_transactions(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    table = mock_supabase_db.return_value
+    category_id = str(uuid.uuid4())
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+
+    def result(rows):
+        execute = MagicMock()
+        type(execute).data = PropertyMock(return_value=rows)
+        return execute
+
+    table.insert.side_effect = lambda rows: MagicMock(execute=MagicMock(return_value=result(
+        [{"id": str(uuid.uuid4()), **row} for row in rows]
+    )))
+    # update(...).eq('user_id', ...).in_('id', ids) echoes back the matched ids
+    table.update.return_value.eq.return_value.in_.side_effect = lambda column, values: MagicMock(
+        execute=MagicMock(return_value=result([{"id": i} for i in values]))
+    )
+    table.delete.return_value.eq.return_value.in_.return_value.execute.return_value = result([{"id": ids[3]}])
+
+    response = authenticated_client.post(
+        "/api/v1/transactions/batch",
+        json={
+            "create": [
+                {"amount": 1.0, "type": "expense", "date": "2025-01-01", "category_id": category_id},
+                {"amount": 2.0, "type": "income", "date": "2025-01-02", "category_id": category_id},
+            ],
+            "update": [
+                {"id": ids[0], "category_id": category_id},
+                {"id": ids[1], "category_id": category_id},
+                {"id": ids[2], "amount": 5.0},
+            ],
+            "delete": [ids[3], str(uuid.uuid4())],
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["op"], r["status"]) for r in results] == [
+        ("create", 200), ("create", 200),
+        ("update", 200), ("update", 200), ("update", 200),
+        ("delete", 200), ("delete", 404),
+    ]
+    assert table.insert.call_count == 1
+    assert table.update.call_count == 2
+    table.update.assert_any_call({"category_id": category_id})
+    assert table.delete.call_count == 1
+
+def test_list_transactions_not_modified(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    query = mock_supabase_db.return_value.select.return_value.match.return_value
+    query.order.return_value = query
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[])
+    query.execute.return_value = mock_execute
+
+    response = authenticated_client.get("/api/v1/transactions/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert query.execute.call_count == 1
+
+    # A write changes the ETag
+    mock_delete = MagicMock()
+    type(mock_delete).data = PropertyMock(return_value=[{"id": "1"}])
+    mock_supabase_db.return_value.delete.return_value.match.return_value.execute.return_value = mock_delete
+    authenticated_client.delete(f"/api/v1/transactions/{uuid.uuid4()}")
+
+    response = authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_list_transactions_fields(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    query = mock_supabase_db.return_value.select.return_value.match.return_value
+    query.order.return_value = query
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[
+        {"date": "2025-12-01", "amount": 10.0, "id": str(uuid.uuid4())},
+    ])
+    query.limit.return_value.execute.return_value = mock_execute
+
+    response = authenticated_client.get("/api/v1/transactions/?fields=amount,date&limit=10")
+
+    assert response.status_code == 200
+    assert response.json() == [{"amount": 10.0, "date": "2025-12-01"}]
+    # The cursor columns are selected too, but not returned
+    mock_supabase_db.return_value.select.assert_called_once_with("amount, date, id")
+
+    response = authenticated_client.get("/api/v1/transactions/?fields=amount,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+def test_create_transaction_idempotency_key(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    insert = mock_supabase_db.return_value.insert.return_value
+    mock_execute = MagicMock()
+    category_id = str(uuid.uuid4())
+    type(mock_execute).data = PropertyMock(return_value=[{
+        "id": str(uuid.uuid4()), "amount": 12.5, "type": "expense", "date": "2025-12-01",
+        "description": "Netflix", "user_id": str(USER_ID), "category_id": category_id,
+    }])
+    insert.execute.return_value = mock_execute
+    body = {"amount": 12.5, "type": "expense", "date": "2025-12-01", "description": "Netflix", "category_id": category_id}
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = authenticated_client.post("/api/v1/transactions/", json=body, headers=headers)
+    replay = authenticated_client.post("/api/v1/transactions/", json=body, headers=headers)
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert insert.execute.call_count == 1
+
+    response = authenticated_client.post("/api/v1/transactions/", json={**body, "amount": 13}, headers=headers)
+    assert response.status_code == 422
+    assert insert.execute.call_count == 1
+
+
+def test_batch_with_upstream_failures_is_not_replayed(authenticated_client: TestClient, mock_supabase_db, USER_ID):
+    insert = mock_supabase_db.return_value.insert.return_value
+    row = {"amount": 1.0, "type": "expense", "date": "2025-01-01", "category_id": str(uuid.uuid4())}
+    mock_execute = MagicMock()
+    type(mock_execute).data = PropertyMock(return_value=[{"id": str(uuid.uuid4()), "user_id": str(USER_ID), **row}])
+    insert.execute.side_effect = [ConnectionError("connection reset"), mock_execute]
+    body = {"create": [row]}
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = authenticated_client.post("/api/v1/transactions/batch", json=body, headers=headers)
+    assert [r["status"] for r in first.json()["results"]] == [503]
+
+    retry = authenticated_client.post("/api/v1/transactions/batch", json=body, headers=headers)
+    assert [r["status"] for r in retry.json()["results"]] == [200]
+    assert "Idempotent-Replayed" not in retry.headers
+    assert insert.execute.call_count == 2
+
+    replay = authenticated_client.post("/api/v1/transactions/batch", json=body, headers=headers)
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert insert.execute.call_count == 2
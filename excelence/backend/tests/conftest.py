@@ -60,3 +60,16 @@ def authenticated_client(client, mock_supabase_auth_user):
 @pytest.fixture
 def mock_supabase_db(mocker):
     return mocker.patch('app.db.session.supabase.table')
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    """Cached dashboard results and search indexes must not leak between tests."""
+    from app.crud.cache import dashboard_cache
+    from app.crud.search import indexes, too_large
+    dashboard_cache.clear()
+    indexes.clear()
+    too_large.clear()
+    yield
+    dashboard_cache.clear()
+    indexes.clear()
+    too_large.clear()
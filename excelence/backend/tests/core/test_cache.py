@@ -0,0 +1,37 @@
+from app.core.cache import TTLCache
+from app.crud import cache as crud_cache
+
+
+def test_weighted_cache_bounds_total_weight():
+    cache = TTLCache(max_size=10, ttl=60, weigh=len)
+    cache.set("a", [1] * 4)
+    cache.set("b", [1] * 4)
+    assert cache.get("a") is not None
+
+    # "b" is the least recently used
+    cache.set("c", [1] * 4)
+    assert cache.get("b") is None
+    assert cache.weight == 8
+
+    # Entries that grow in place are re-measured
+    cache.get("a").extend([1] * 4)
+    cache.reweigh("a")
+    assert cache.get("c") is None
+    assert cache.weight == 8
+
+    # An entry heavier than the whole cache is not kept
+    cache.set("d", [1] * 11)
+    assert cache.get("d") is None
+    assert cache.weight == 8
+
+
+def test_evicted_data_versions_are_not_reused(monkeypatch):
+    monkeypatch.setattr(crud_cache, "_data_versions", TTLCache(max_size=1, ttl=60))
+    seen = {crud_cache.data_version("a")}
+    crud_cache.invalidate_user_data("a")
+    seen.add(crud_cache.data_version("a"))
+    assert crud_cache.data_version("a") == max(seen)
+
+    # Remembering "b" evicts "a", whose next version is new
+    crud_cache.data_version("b")
+    assert crud_cache.data_version("a") not in seen
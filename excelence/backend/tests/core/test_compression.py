@@ -0,0 +1,99 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression, responses
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("x" * 10_000)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("x" * 10)
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 10_000), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/xlsx")
+    def xlsx():
+        return Response(b"x" * 10_000, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"x" * 1000 for _ in range(10)), media_type="text/csv")
+
+    return TestClient(app)
+
+
+def test_large_responses_are_gzipped():
+    client = make_client()
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.text == "x" * 10_000
+    assert response.num_bytes_downloaded < 1000
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_encoded_responses_are_not_compressed_again():
+    response = make_client().get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == b"x" * 10_000
+
+
+def test_excluded_media_types_are_not_compressed():
+    response = make_client().get("/xlsx", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.content == b"x" * 10_000
+
+
+def test_streaming_responses_are_gzipped():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.text == "x" * 10_000
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+def test_brotli_is_preferred_when_accepted():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.content == b"x" * 10_000
+    assert response.num_bytes_downloaded < 1000
+
+
+def test_default_response_class(mocker):
+    mocker.patch.object(settings, "JSON_RESPONSE", "orjson")
+    assert responses.default_response_class() is responses.OrjsonResponse
+
+    mocker.patch.object(settings, "JSON_RESPONSE", "json")
+    assert responses.default_response_class() is JSONResponse
+
+    mocker.patch.object(settings, "JSON_RESPONSE", "auto")
+    mocker.patch.object(responses, "_pydantic_dumps_json", return_value=True)
+    assert isinstance(responses.default_response_class(), DefaultPlaceholder)
+
+    mocker.patch.object(responses, "_pydantic_dumps_json", return_value=False)
+    assert responses.default_response_class() is responses.OrjsonResponse
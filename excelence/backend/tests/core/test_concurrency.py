@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+from app.core import metrics
+from app.core.concurrency import AdaptiveLimit, ConcurrencyLimitMiddleware
+
+
+def test_limit_shrinks_when_latency_rises_and_recovers():
+    limit = AdaptiveLimit(initial=20, min_limit=4, max_limit=40)
+    for _ in range(50):
+        limit.update(0.02, in_flight=20)
+    steady = limit.limit
+    assert steady == 40
+
+    for _ in range(50):
+        limit.update(0.5, in_flight=40)
+    assert limit.limit < steady / 2
+    assert limit.limit >= 4
+
+    for _ in range(200):
+        limit.update(0.02, in_flight=round(limit.limit))
+    assert limit.limit == 40
+
+
+def test_limit_does_not_grow_while_underused():
+    limit = AdaptiveLimit(initial=10, min_limit=4, max_limit=40)
+    for _ in range(50):
+        limit.update(0.02, in_flight=1)
+    assert limit.limit == 10
+
+
+def test_over_limit_requests_get_fast_503():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    limited = ConcurrencyLimitMiddleware(
+        app, prefix="/api/v1", groups=["export", "categories"],
+        initial=2, min_limit=1, max_limit=40, budgets={"export": 1},
+    )
+    rejected = metrics.concurrency_rejections_total.value("export")
+
+    async def main():
+        transport = httpx.ASGITransport(app=limited)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/v1/export/csv"))
+            await asyncio.sleep(0.01)
+            second = await client.get("/api/v1/export/csv")
+            # Other routers have their own budget
+            other = asyncio.create_task(client.get("/api/v1/categories/"))
+            await asyncio.sleep(0.01)
+            release.set()
+            return await first, second, await other
+
+    first, second, other = asyncio.run(main())
+
+    assert first.status_code == 200
+    assert other.status_code == 200
+    assert second.status_code == 503
+    assert int(second.headers["Retry-After"]) >= 1
+    assert metrics.concurrency_rejections_total.value("export") == rejected + 1
+    assert metrics.concurrency_in_flight.value("export") == 0
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from app.core.idempotency import IdempotencyStore, scoped_key
+
+
+class Payload(BaseModel):
+    amount: float
+
+
+def test_failed_requests_are_not_stored():
+    store = IdempotencyStore(max_size=10, ttl=60)
+    key = scoped_key("abc", "user", "POST /things/")
+
+    async def fail():
+        raise ValueError("upstream said no")
+
+    with pytest.raises(ValueError):
+        asyncio.run(store.run(key, Payload(amount=1), Response(), fail))
+
+    async def succeed():
+        return {"id": 1}
+
+    assert asyncio.run(store.run(key, Payload(amount=1), Response(), succeed)) == {"id": 1}
+
+
+def test_concurrent_retry_gets_409():
+    store = IdempotencyStore(max_size=10, ttl=60)
+    key = scoped_key("abc", "user", "POST /things/")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return {"id": 1}
+
+        first = asyncio.create_task(store.run(key, Payload(amount=1), Response(), slow))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            await store.run(key, Payload(amount=1), Response(), slow)
+        release.set()
+        return await first, raised.value
+
+    result, error = asyncio.run(main())
+    assert result == {"id": 1}
+    assert error.status_code == 409
+
+
+def test_key_length_is_checked():
+    assert scoped_key(None, "user") is None
+    with pytest.raises(HTTPException) as raised:
+        scoped_key("x" * 256, "user")
+    assert raised.value.status_code == 400
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import time
+
+from app.core import metrics
+from app.core.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+def test_stall_is_attributed_to_route_and_stack(caplog):
+    route = "/api/v1/things/{thing_id}"
+    scope = {
+        "type": "http", "method": "GET", "path": "/api/v1/things/42",
+        "endpoint": object(), "path_params": {"thing_id": "42"},
+    }
+
+    async def app(scope, receive, send):
+        blocking_handler()
+        await asyncio.sleep(0.05)
+
+    async def main():
+        monitor = LoopMonitor(threshold=0.1, interval=0.02)
+        monitor.start()
+        try:
+            await LoopMonitorMiddleware(app)(scope, None, None)
+        finally:
+            monitor.stop()
+
+    stalls = metrics.event_loop_stalls_total.value(route)
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        asyncio.run(main())
+
+    assert metrics.event_loop_stalls_total.value(route) == stalls + 1
+    assert metrics.event_loop_lag_seconds.count() > 0
+    [record] = caplog.records
+    assert "GET /api/v1/things/42" in record.getMessage()
+    assert "blocking_handler" in record.getMessage()
+
+
+def test_no_stall_when_loop_keeps_turning(caplog):
+    async def main():
+        monitor = LoopMonitor(threshold=0.1, interval=0.02)
+        monitor.start()
+        await asyncio.sleep(0.2)
+        monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        asyncio.run(main())
+
+    assert caplog.records == []
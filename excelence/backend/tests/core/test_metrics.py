@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.config import settings
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "select")
+
+    assert histogram.samples() == [
+        'test_seconds_bucket{op="select",le="0.1"} 1',
+        'test_seconds_bucket{op="select",le="1.0"} 3',
+        'test_seconds_bucket{op="select",le="+Inf"} 4',
+        'test_seconds_sum{op="select"} 6.05',
+        'test_seconds_count{op="select"} 4',
+    ]
+
+
+def test_requests_and_upstream_calls_are_recorded(authenticated_client: TestClient, mock_supabase_db, mocker):
+    mocker.patch.object(settings, "METRICS_TOKEN", "scrape-token")
+    route = "/api/v1/categories/"
+    requests_before = metrics.http_requests_total.value("GET", route, "200")
+    selects_before = metrics.upstream_request_duration_seconds.count("select")
+    auth_before = metrics.upstream_request_duration_seconds.count("auth.get_user")
+
+    response_data = MagicMock()
+    response_data.data = []
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = response_data
+
+    assert authenticated_client.get(route).status_code == 200
+    assert authenticated_client.get("/no-such-route").status_code == 404
+
+    assert metrics.http_requests_total.value("GET", route, "200") == requests_before + 1
+    assert metrics.upstream_request_duration_seconds.count("select") == selects_before + 1
+    assert metrics.upstream_request_duration_seconds.count("auth.get_user") == auth_before + 1
+
+    response = authenticated_client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert f'http_request_duration_seconds_count{{method="GET",route="{route}"}}' in response.text
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in response.text
+    assert "# TYPE upstream_request_duration_seconds histogram" in response.text
+
+
+def test_route_template_restores_path_parameters():
+    scope = {
+        "path": "/api/v1/transactions/7f1c0b9e",
+        "path_params": {"transaction_id": "7f1c0b9e"},
+        "endpoint": object(),
+    }
+    assert metrics.route_template(scope) == "/api/v1/transactions/{transaction_id}"
+    assert metrics.route_template({"path": "/missing"}) == "<unmatched>"
+
+
+def test_metrics_require_the_token(client: TestClient, mocker):
+    mocker.patch.object(settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+    mocker.patch.object(settings, "METRICS_TOKEN", "scrape-token")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).status_code == 200
@@ -0,0 +1,32 @@
+from app.core.text_index import EXACT, ONE_TYPO, PREFIX, TWO_TYPOS, TextIndex, edit_distance, tokenize
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Café NOËL, 2x") == ["cafe", "noel", "2x"]
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("netflix", "netlfix", 2) == 1
+    assert edit_distance("rent", "groceries", 2) == 3
+
+
+def test_prefix_and_typo_matches_are_weighted():
+    index = TextIndex.build([(1, "Netflix"), (2, "Net market"), (3, "Supermarket")])
+
+    assert index.search("net") == {2: EXACT, 1: PREFIX}
+    assert index.search("netflx") == {1: ONE_TYPO}
+    assert index.search("supremarkt") == {3: TWO_TYPOS}
+    # Short terms must match exactly or as a prefix
+    assert index.search("nrt") == {}
+
+
+def test_incremental_updates():
+    index = TextIndex.build([(1, "Rent")])
+    index.add(2, "Rental car")
+    index.add(1, "Mortgage")
+
+    assert index.search("rent") == {2: PREFIX}
+    assert index.search("mortgage") == {1: EXACT}
+    index.remove(2)
+    assert index.search("rent") == {}
+    assert index.vocabulary == ["mortgage"]
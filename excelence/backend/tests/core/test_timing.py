@@ -0,0 +1,34 @@
+import re
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.core.timing import RequestTimings
+
+
+def test_header_reports_calls_and_remainder():
+    timings = RequestTimings()
+    timings.add("auth", 0.002)
+    timings.add("db", 0.010)
+    timings.add("db", 0.005)
+    timings.add("serialize", 0.001)
+
+    assert timings.header(total=0.020) == (
+        'auth;dur=2.0;desc="1 call", db;dur=15.0;desc="2 calls", '
+        "serialize;dur=1.0, app;dur=2.0, total;dur=20.0"
+    )
+
+
+def test_responses_carry_server_timing(authenticated_client: TestClient, mock_supabase_db):
+    response_data = MagicMock()
+    response_data.data = []
+    mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value = response_data
+
+    response = authenticated_client.get("/api/v1/categories/")
+
+    assert response.status_code == 200
+    server_timing = response.headers["Server-Timing"]
+    assert re.search(r'auth;dur=[\d.]+;desc="1 call"', server_timing)
+    assert re.search(r'db;dur=[\d.]+;desc="1 call"', server_timing)
+    assert "serialize;dur=" in server_timing
+    assert re.search(r"total;dur=[\d.]+$", server_timing)
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics, upstream
+from app.core.upstream import CircuitBreaker, UpstreamUnavailable
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setitem(upstream.breakers, "database", CircuitBreaker("database", 3, 10))
+    monkeypatch.setattr(upstream, "backoff", lambda attempt: 0)
+
+
+def flaky(failures, exc=ConnectionError("connection reset")):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc
+        return "rows"
+    return fn, calls
+
+
+def test_reads_are_retried_on_transient_failures():
+    fn, calls = flaky(2)
+    retries = metrics.upstream_retries_total.value("select")
+
+    assert asyncio.run(upstream.call(fn, "select")) == "rows"
+    assert len(calls) == 3
+    assert metrics.upstream_retries_total.value("select") == retries + 2
+    assert upstream.breakers["database"].state == CircuitBreaker.CLOSED
+
+
+def test_writes_are_not_retried():
+    fn, calls = flaky(1)
+
+    with pytest.raises(UpstreamUnavailable) as raised:
+        asyncio.run(upstream.call(fn, "insert"))
+    assert raised.value.status_code == 503
+    assert len(calls) == 1
+
+
+def test_request_errors_pass_through_and_keep_circuit_closed():
+    for _ in range(5):
+        fn, calls = flaky(1, ValueError("duplicate key"))
+        with pytest.raises(ValueError):
+            asyncio.run(upstream.call(fn, "select"))
+        assert len(calls) == 1
+    assert upstream.breakers["database"].state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast_then_recovers(monkeypatch):
+    breaker = upstream.breakers["database"]
+    fn, calls = flaky(3)
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(upstream.call(fn, "select"))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert metrics.circuit_breaker_state.value("database") == 2
+
+    with pytest.raises(UpstreamUnavailable) as raised:
+        asyncio.run(upstream.call(fn, "select"))
+    assert len(calls) == 3
+    assert int(raised.value.headers["Retry-After"]) == 10
+
+    # After the reset timeout one trial call goes through and closes it
+    monkeypatch.setattr(breaker, "_opened_at", breaker._opened_at - 10)
+    assert asyncio.run(upstream.call(fn, "select")) == "rows"
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert metrics.circuit_breaker_state.value("database") == 0
+
+
+def test_transient_upstream_failure_is_a_503(authenticated_client: TestClient, mock_supabase_db):
+    query = mock_supabase_db.return_value.select.return_value.eq.return_value.order.return_value
+    query.execute.side_effect = ConnectionError("connection reset")
+
+    response = authenticated_client.get("/api/v1/categories/")
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert query.execute.call_count == 3
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from jose import jwt
+
+from app.db import session
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def make_token(sub, expires_in=3600):
+    return jwt.encode({"sub": sub, "exp": int(time.time()) + expires_in}, "secret", algorithm="HS256")
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    session.rls_clients.clear()
+    yield
+    session.rls_clients.clear()
+
+
+def test_rls_clients_are_reused_per_token():
+    token = make_token("user-a")
+
+    client = session.get_supabase_client(token)
+
+    assert session.get_supabase_client(token) is client
+    assert client.postgrest.session.headers["Authorization"] == f"Bearer {token}"
+    assert session.get_supabase_client(make_token("user-b")) is not client
+
+
+def test_rls_client_closed_after_eviction(mocker):
+    mocker.patch.object(session.rls_clients, "max_size", 1)
+    first = session.get_supabase_client(make_token("user-a"))
+
+    session.get_supabase_client(make_token("user-b"))
+
+    # A request may still be using the evicted client
+    assert len(session.rls_clients) == 1
+    assert not first.postgrest.session.is_closed
+
+    session.close_retired_clients(delay=0)
+    assert first.postgrest.session.is_closed
+
+
+def test_rls_client_rejects_expired_token():
+    with pytest.raises(ValueError):
+        session.get_supabase_client(make_token("user-a", expires_in=-5))
+    assert len(session.rls_clients) == 0
+
+
+def test_no_token_returns_global_client():
+    assert session.get_supabase_client() is session.supabase
+
+
+def test_supabase_is_imported_only_when_needed():
+    # Run in a fresh interpreter: this one already has supabase imported
+    env = {**os.environ, "STORAGE_BACKEND": "sqlite", "AUTH_LOCAL_JWT": "true"}
+    code = (
+        "import sys, main; "
+        "print(sorted(m for m in ('supabase', 'openpyxl') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip().splitlines()[-1] == "[]"
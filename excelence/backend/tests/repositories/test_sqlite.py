@@ -0,0 +1,181 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import repositories
+from app.core.config import settings
+from app.repositories.sqlite import SQLiteRepository
+
+
+@pytest.fixture
+def sqlite_repository(mocker):
+    repository = SQLiteRepository(":memory:")
+    mocker.patch.object(repositories, "_repository", repository)
+    yield repository
+    repository.db.close()
+
+
+def create(client: TestClient, path: str, payload: dict) -> dict:
+    response = client.post(f"{settings.API_V1_STR}/{path}/", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_sqlite_backend_end_to_end(authenticated_client: TestClient, sqlite_repository):
+    food = create(authenticated_client, "categories", {"name": "Food", "emoji": "🍕"})
+    rent = create(authenticated_client, "categories", {"name": "Rent"})
+    for amount, kind, day, category in [
+        (1000.0, "income", "2026-01-01", food),
+        (30.0, "expense", "2026-01-02", food),
+        (20.0, "expense", "2026-01-02", food),
+        (500.0, "expense", "2026-01-03", rent),
+    ]:
+        create(authenticated_client, "transactions", {
+            "amount": amount, "type": kind, "date": day, "category_id": category["id"],
+        })
+
+    summary = authenticated_client.get(f"{settings.API_V1_STR}/dashboard/summary").json()
+    assert summary == {"total_income": 1000.0, "total_expenses": 550.0, "net_balance": 450.0}
+
+    chart = authenticated_client.get(f"{settings.API_V1_STR}/dashboard/chart-data").json()
+    assert [(p["category_name"], p["total_amount"]) for p in chart["data"]] == [("Rent", 500.0), ("Food", 50.0)]
+
+    # 2026-01-01 is a Thursday, so the first two days share a week
+    timeseries = authenticated_client.get(
+        f"{settings.API_V1_STR}/dashboard/timeseries", params={"granularity": "week", "group_by": "category"}
+    ).json()
+    assert timeseries["periods"] == ["2025-12-29"]
+    assert timeseries["series"] == [{"name": "Rent", "values": [500.0]}, {"name": "Food", "values": [50.0]}]
+
+    # Keyset pagination walks the same (date, id) order as the unpaginated list
+    everything = authenticated_client.get(f"{settings.API_V1_STR}/transactions/").json()
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = authenticated_client.get(f"{settings.API_V1_STR}/transactions/", params=params)
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [t["id"] for t in seen] == [t["id"] for t in everything]
+    assert [t["date"] for t in everything] == ["2026-01-03", "2026-01-02", "2026-01-02", "2026-01-01"]
+
+    # Embedded category names in the export
+    csv = authenticated_client.get(f"{settings.API_V1_STR}/export/csv").text
+    assert "2026-01-03,,Rent,500.0,expense" in csv
+
+    categories = authenticated_client.get(
+        f"{settings.API_V1_STR}/categories/", params={"with_usage": True, "fields": "name"}
+    ).json()
+    assert categories == [
+        {"name": "Food", "transaction_count": 3, "last_used": "2026-01-02", "month_income": 0, "month_expense": 0},
+        {"name": "Rent", "transaction_count": 1, "last_used": "2026-01-03", "month_income": 0, "month_expense": 0},
+    ]
+
+    # Categories in use cannot be deleted
+    response = authenticated_client.delete(f"{settings.API_V1_STR}/categories/{rent['id']}")
+    assert response.status_code == 400
+
+
+def test_sqlite_category_usage_splits_month_by_type(authenticated_client: TestClient, sqlite_repository):
+    shopping = create(authenticated_client, "categories", {"name": "Shopping"})
+    today = datetime.now(timezone.utc).date().isoformat()
+    for kind in ("expense", "income"):  # a purchase and its refund
+        create(authenticated_client, "transactions", {
+            "amount": 500.0, "type": kind, "date": today, "category_id": shopping["id"],
+        })
+
+    categories = authenticated_client.get(
+        f"{settings.API_V1_STR}/categories/", params={"with_usage": True, "fields": "name"}
+    ).json()
+    assert categories == [
+        {"name": "Shopping", "transaction_count": 2, "last_used": today, "month_income": 500.0, "month_expense": 500.0},
+    ]
+
+
+def test_sqlite_rejects_unknown_columns(sqlite_repository, USER_ID):
+    with pytest.raises(ValueError):
+        asyncio.run(sqlite_repository.categories.list(USER_ID, columns="id, name; drop table categories"))
+
+
+def test_sqlite_transaction_search(authenticated_client: TestClient, sqlite_repository):
+    search = f"{settings.API_V1_STR}/transactions/search"
+    food = create(authenticated_client, "categories", {"name": "Groceries"})
+    fun = create(authenticated_client, "categories", {"name": "Entertainment"})
+    netflix = create(authenticated_client, "transactions", {
+        "amount": 15.0, "type": "expense", "date": "2026-01-05", "description": "Netflix subscription", "category_id": fun["id"],
+    })
+    create(authenticated_client, "transactions", {
+        "amount": 40.0, "type": "expense", "date": "2026-01-02", "description": "Café Noël", "category_id": food["id"],
+    })
+    market = create(authenticated_client, "transactions", {
+        "amount": 60.0, "type": "expense", "date": "2026-01-03", "description": "Net market", "category_id": food["id"],
+    })
+
+    def descriptions(q, **params):
+        response = authenticated_client.get(search, params={"q": q, **params})
+        assert response.status_code == 200, response.text
+        return [t["description"] for t in response.json()]
+
+    # A typo, a prefix, accents and category names all match
+    assert descriptions("netflx") == ["Netflix subscription"]
+    assert descriptions("cafe") == ["Café Noël"]
+    assert descriptions("groceries noel") == ["Café Noël"]
+    # The whole word ranks above a prefix of a longer one
+    assert descriptions("net") == ["Net market", "Netflix subscription"]
+    assert descriptions("sushi") == []
+
+    # Pages follow the ranked order
+    seen, cursor = [], None
+    while True:
+        response = authenticated_client.get(search, params={"q": "groc", "limit": 1, **({"cursor": cursor} if cursor else {})})
+        seen.extend(t["description"] for t in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == ["Net market", "Café Noël"]
+
+    # Writes update the index
+    response = authenticated_client.put(
+        f"{settings.API_V1_STR}/transactions/{netflix['id']}", json={"description": "Spotify"}
+    )
+    assert response.status_code == 200
+    assert descriptions("netflix") == []
+    assert descriptions("spotfy") == ["Spotify"]
+    authenticated_client.delete(f"{settings.API_V1_STR}/transactions/{market['id']}")
+    assert descriptions("market") == []
+    authenticated_client.put(f"{settings.API_V1_STR}/categories/{fun['id']}", json={"name": "Music"})
+    assert descriptions("music") == ["Spotify"]
+
+    assert authenticated_client.get(search, params={"q": "!!"}).status_code == 400
+    assert authenticated_client.get(search, params={"q": "net", "cursor": "bogus"}).status_code == 400
+
+
+def test_sqlite_search_over_index_cap(authenticated_client: TestClient, sqlite_repository, mocker):
+    from app.crud import search as search_module
+    mocker.patch.object(search_module.indexes, "max_size", 2)
+    mocker.patch.object(settings, "EXPORT_PAGE_SIZE", 1)
+    search = f"{settings.API_V1_STR}/transactions/search"
+    food = create(authenticated_client, "categories", {"name": "Food"})
+    created = [
+        create(authenticated_client, "transactions", {
+            "amount": 10.0, "type": "expense", "date": f"2026-01-0{day}", "description": "Lunch", "category_id": food["id"],
+        })
+        for day in (1, 2, 3)
+    ]
+    list_rows = mocker.spy(sqlite_repository.transactions, "list")
+
+    response = authenticated_client.get(search, params={"q": "lunch"})
+    assert response.status_code == 400
+    assert "more than 2 transactions" in response.json()["detail"]
+    # Loading stopped past the cap, and the next search does not load again
+    assert list_rows.call_count == 3
+    assert authenticated_client.get(search, params={"q": "lunch"}).status_code == 400
+    assert list_rows.call_count == 3
+
+    authenticated_client.delete(f"{settings.API_V1_STR}/transactions/{created[0]['id']}")
+    response = authenticated_client.get(search, params={"q": "lunch"})
+    assert response.status_code == 200
+    assert len(response.json()) == 2